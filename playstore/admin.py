@@ -1,7 +1,9 @@
 from django.contrib import admin
-from .models import App, Review, ReviewApproval, UserProfile
+from .models import App, Review, ReviewApproval, UserProfile, AppSentimentDaily, PartnerKey
 
 admin.site.register(App)
 admin.site.register(Review)
 admin.site.register(ReviewApproval)
 admin.site.register(UserProfile)
+admin.site.register(AppSentimentDaily)
+admin.site.register(PartnerKey)
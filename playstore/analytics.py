@@ -0,0 +1,311 @@
+"""Columnar analytics snapshots and the aggregations served from them.
+
+``export_snapshot`` streams ``App`` and ``Review`` out of the database (a
+replica when one is configured) into Parquet files, converting the CSV-era
+string columns to real types on the way: installs and review counts become
+integers, price a float, size bytes, ``last_updated`` a date. Each export
+lands in its own directory and is published by atomically rewriting the
+``CURRENT`` pointer, so readers never see a half-written snapshot.
+
+The dashboard reads the current snapshot through ``load_snapshot`` (Parquet
+memory-mapped, decoded once per process and cached until a newer snapshot
+is published) and answers every question with vectorized pandas/NumPy; it
+never queries the database.
+"""
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.conf import settings
+
+from .models import App, Review
+
+CURRENT = 'CURRENT'
+EXPORT_CHUNK_SIZE = 100000
+
+APP_SCHEMA = pa.schema([
+	('id', pa.int64()),
+	('name', pa.string()),
+	('category', pa.string()),
+	('rating', pa.float32()),
+	('reviews_count', pa.int64()),
+	('size_bytes', pa.int64()),
+	('installs', pa.int64()),
+	('is_free', pa.bool_()),
+	('price', pa.float32()),
+	('content_rating', pa.string()),
+	('genres', pa.string()),
+	('last_updated', pa.date32()),
+	('current_ver', pa.string()),
+	('android_ver', pa.string()),
+])
+REVIEW_SCHEMA = pa.schema([
+	('id', pa.int64()),
+	('app_id', pa.int64()),
+	('sentiment', pa.string()),
+	('sentiment_polarity', pa.float32()),
+	('sentiment_subjectivity', pa.float32()),
+	('approved', pa.bool_()),
+	('created_at', pa.timestamp('us', tz='UTC')),
+])
+# Low-cardinality strings come back as pandas categoricals
+DICTIONARY_COLUMNS = {
+	'apps': ['category', 'content_rating', 'genres', 'android_ver'],
+	'reviews': ['sentiment'],
+}
+_APP_FIELDS = [
+	'id', 'name', 'category', 'rating', 'reviews_count', 'size', 'installs', 'type', 'price',
+	'content_rating', 'genres', 'last_updated', 'current_ver', 'android_ver',
+]
+_REVIEW_FIELDS = [f.name for f in REVIEW_SCHEMA]
+_SIZE_UNITS = {'k': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def snapshot_root():
+	return Path(settings.ANALYTICS_SNAPSHOT_DIR)
+
+
+def _number(series):
+	"""Parse '10,000+', '$4.99' or '500000.0' style strings; anything else is NaN."""
+	cleaned = series.astype('string').str.replace(r'[,+$\s]', '', regex=True)
+	return pd.to_numeric(cleaned, errors='coerce')
+
+
+def _size_bytes(series):
+	"""'19M' / '201k' to bytes; 'Varies with device' and blanks to NA."""
+	parts = series.astype('string').str.strip().str.extract(r'^([0-9.]+)\s*([kMG])?$')
+	value = pd.to_numeric(parts[0], errors='coerce')
+	return (value * parts[1].map(_SIZE_UNITS).fillna(1)).round().astype('Int64')
+
+
+def _category(series):
+	"""Trimmed strings with empties as NA."""
+	values = series.astype('string').str.strip()
+	return values.mask(values.eq(''))
+
+
+def typed_apps(frame):
+	"""Convert raw ``App`` rows (CSV strings) to the typed snapshot columns."""
+	price = _number(frame['price'])
+	kind = frame['type'].astype('string').str.strip().str.lower()
+	return pd.DataFrame({
+		'id': frame['id'].astype('int64'),
+		'name': frame['name'].astype('string'),
+		'category': _category(frame['category']),
+		'rating': pd.to_numeric(frame['rating'], errors='coerce').astype('float32'),
+		'reviews_count': _number(frame['reviews_count']).round().astype('Int64'),
+		'size_bytes': _size_bytes(frame['size']),
+		'installs': _number(frame['installs']).round().astype('Int64'),
+		'is_free': (kind.eq('free') | (kind.isna() & price.eq(0))).astype('boolean'),
+		'price': price.astype('float32'),
+		'content_rating': _category(frame['content_rating']),
+		'genres': _category(frame['genres']),
+		'last_updated': pd.to_datetime(frame['last_updated'], format='%B %d, %Y', errors='coerce'),
+		'current_ver': _category(frame['current_ver']),
+		'android_ver': _category(frame['android_ver']),
+	})
+
+
+def typed_reviews(frame):
+	sentiment = _category(frame['sentiment']).str.capitalize()
+	return pd.DataFrame({
+		'id': frame['id'].astype('int64'),
+		'app_id': frame['app_id'].astype('int64'),
+		'sentiment': sentiment,
+		'sentiment_polarity': pd.to_numeric(frame['sentiment_polarity'], errors='coerce').astype('float32'),
+		'sentiment_subjectivity': pd.to_numeric(frame['sentiment_subjectivity'], errors='coerce').astype('float32'),
+		'approved': frame['approved'].astype(bool),
+		'created_at': pd.to_datetime(frame['created_at'], utc=True),
+	})
+
+
+def _write(queryset, fields, convert, schema, path, chunk_size):
+	"""Stream ``queryset`` to one Parquet file, ``chunk_size`` rows per row group."""
+	rows = 0
+	with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+		chunk = []
+		for row in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+			chunk.append(row)
+			if len(chunk) >= chunk_size:
+				writer.write_table(pa.Table.from_pandas(convert(pd.DataFrame(chunk, columns=fields)), schema, preserve_index=False))
+				rows += len(chunk)
+				chunk = []
+		if chunk or not rows:
+			writer.write_table(pa.Table.from_pandas(convert(pd.DataFrame(chunk, columns=fields)), schema, preserve_index=False))
+			rows += len(chunk)
+	return rows
+
+
+def export_snapshot(using='default', chunk_size=EXPORT_CHUNK_SIZE, keep=None):
+	"""Write a new snapshot from database ``using``, publish it, return its manifest."""
+	root = snapshot_root()
+	root.mkdir(parents=True, exist_ok=True)
+	now = datetime.now(dt_timezone.utc)
+	name = f'{now:%Y%m%dT%H%M%S%f}'
+	staging = root / f'.{name}.tmp'
+	staging.mkdir()
+	try:
+		apps = _write(
+			App.objects.using(using).order_by('id'), _APP_FIELDS, typed_apps,
+			APP_SCHEMA, staging / 'apps.parquet', chunk_size,
+		)
+		reviews = _write(
+			Review.objects.using(using).order_by('id'), _REVIEW_FIELDS, typed_reviews,
+			REVIEW_SCHEMA, staging / 'reviews.parquet', chunk_size,
+		)
+		manifest = {'name': name, 'created_at': now.isoformat(), 'source': using, 'apps': apps, 'reviews': reviews}
+		with open(staging / 'manifest.json', 'w', encoding='utf-8') as fh:
+			json.dump(manifest, fh)
+		os.replace(staging, root / name)
+	except BaseException:
+		shutil.rmtree(staging, ignore_errors=True)
+		raise
+	pointer = root / f'.{CURRENT}.tmp'
+	pointer.write_text(name, encoding='utf-8')
+	os.replace(pointer, root / CURRENT)
+	_prune(root, name, keep or settings.ANALYTICS_SNAPSHOT_KEEP)
+	return manifest
+
+
+def _prune(root, current, keep):
+	# Readers may still hold the previous snapshot mapped; keep a few around
+	names = sorted(p.name for p in root.iterdir() if p.is_dir() and not p.name.startswith('.'))
+	for stale in names[:max(0, len(names) - keep)]:
+		if stale != current:
+			shutil.rmtree(root / stale, ignore_errors=True)
+
+
+class Snapshot:
+	"""A loaded snapshot: typed ``apps`` / ``reviews`` DataFrames plus its manifest."""
+
+	__slots__ = ('name', 'manifest', 'apps', 'reviews')
+
+	def __init__(self, name, manifest, apps, reviews):
+		self.name = name
+		self.manifest = manifest
+		self.apps = apps
+		self.reviews = reviews
+
+	@classmethod
+	def read(cls, directory):
+		with open(directory / 'manifest.json', encoding='utf-8') as fh:
+			manifest = json.load(fh)
+		frames = {
+			table: pq.read_table(
+				directory / f'{table}.parquet', memory_map=True,
+				read_dictionary=DICTIONARY_COLUMNS[table],
+			).to_pandas()
+			for table in ('apps', 'reviews')
+		}
+		return cls(directory.name, manifest, frames['apps'], frames['reviews'])
+
+
+_lock = threading.Lock()
+_loaded = None
+
+
+def current_name():
+	try:
+		return (snapshot_root() / CURRENT).read_text(encoding='utf-8').strip() or None
+	except FileNotFoundError:
+		return None
+
+
+def load_snapshot():
+	"""The published snapshot, or None if none has been exported yet."""
+	global _loaded
+	name = current_name()
+	if name is None:
+		return None
+	snapshot = _loaded
+	if snapshot is not None and snapshot.name == name:
+		return snapshot
+	with _lock:
+		if _loaded is None or _loaded.name != name:
+			_loaded = Snapshot.read(snapshot_root() / name)
+		return _loaded
+
+
+def _filter_category(apps, category):
+	return apps[apps['category'] == category] if category else apps
+
+
+def category_summary(snapshot, category=None):
+	"""Per-category app count, rating and install statistics."""
+	apps = _filter_category(snapshot.apps, category)
+	installs = apps['installs'].astype('float64')
+	summary = pd.DataFrame({
+		'category': apps['category'],
+		'rating': apps['rating'],
+		'installs': installs,
+		'paid': ~apps['is_free'].fillna(True).astype(bool),
+		'price': apps['price'].where(apps['price'] > 0),
+	}).groupby('category', observed=True).agg(
+		apps=('rating', 'size'),
+		avg_rating=('rating', 'mean'),
+		rated_apps=('rating', 'count'),
+		median_installs=('installs', 'median'),
+		total_installs=('installs', 'sum'),
+		paid_share=('paid', 'mean'),
+		avg_paid_price=('price', 'mean'),
+	)
+	return summary.sort_values('apps', ascending=False).reset_index()
+
+
+def genre_sentiment(snapshot, category=None, approved_only=False):
+	"""Review sentiment mix per genre (an app with 'A;B' counts for both)."""
+	apps = _filter_category(snapshot.apps, category)
+	reviews = snapshot.reviews
+	keep = reviews['sentiment'].notna().to_numpy()
+	if approved_only:
+		keep &= reviews['approved'].to_numpy()
+	# Apps are exported in id order, so mapping reviews to app rows is a binary search
+	app_ids = apps['id'].to_numpy()
+	review_apps = reviews['app_id'].to_numpy()[keep]
+	rows = np.minimum(np.searchsorted(app_ids, review_apps), max(len(app_ids) - 1, 0))
+	found = app_ids[rows] == review_apps if len(app_ids) else np.zeros(len(rows), dtype=bool)
+	combos = apps['genres'].cat.categories  # distinct 'A;B' strings
+	sentiments = reviews['sentiment'].cat.categories
+	combo = apps['genres'].cat.codes.to_numpy()[rows[found]]
+	sentiment = reviews['sentiment'].cat.codes.to_numpy()[keep][found]
+	has_genre = combo >= 0
+	combo_counts = np.bincount(
+		combo[has_genre].astype(np.int64) * len(sentiments) + sentiment[has_genre],
+		minlength=len(combos) * len(sentiments),
+	).reshape(len(combos), len(sentiments))
+	# Spread each combination's counts onto its individual genres
+	split = pd.Series(combos, dtype='string').str.split(';').explode().str.strip()
+	genres, genre_index = np.unique(split.to_numpy(dtype=str), return_inverse=True)
+	membership = np.zeros((len(combos), len(genres)), dtype=np.int64)
+	membership[split.index.to_numpy(), genre_index] = 1
+	counts = pd.DataFrame(membership.T @ combo_counts, index=pd.Index(genres, name='genre'), columns=list(sentiments))
+	totals = counts.sum(axis=1)
+	counts, totals = counts[totals > 0], totals[totals > 0]
+	shares = counts.div(totals, axis=0).add_suffix('_share')
+	result = pd.concat([counts, shares], axis=1).assign(reviews=totals)
+	return result.sort_values('reviews', ascending=False).reset_index()
+
+
+def installs_distribution(snapshot, category=None):
+	"""App counts per install tier, with cumulative share."""
+	installs = _filter_category(snapshot.apps, category)['installs'].dropna().to_numpy(dtype=np.int64)
+	tiers, counts = np.unique(installs, return_counts=True)
+	total = counts.sum()
+	return pd.DataFrame({
+		'installs': tiers,
+		'apps': counts,
+		'share': counts / total if total else counts,
+		'cumulative_share': np.cumsum(counts) / total if total else counts,
+	})
+
+
+def records(frame):
+	"""JSON-safe list of dicts (NaN/NA become None)."""
+	return json.loads(frame.to_json(orient='records', date_format='iso'))
@@ -0,0 +1,134 @@
+"""Compact, array-backed snapshot of the App fields shown in search results.
+
+Names live in one UTF-8 buffer addressed by an offsets array, categories are
+dictionary-encoded, and numeric fields are fixed-width NumPy arrays, so a row
+costs a small fixed number of bytes (plus its name) instead of a Django model
+instance. Rows keep ``App.Meta.ordering`` (by name).
+"""
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from .models import App
+
+INSTALLS_UNKNOWN = -1
+
+
+class CatalogEntry(NamedTuple):
+	id: int
+	name: str
+	category: Optional[str]
+	rating: Optional[float]
+	installs: Optional[int]
+
+
+def parse_installs(value):
+	"""Parse CSV-style install counts ('1,000,000+', '10000.0') to an int."""
+	if value is None:
+		return INSTALLS_UNKNOWN
+	text = str(value).replace(',', '').replace('+', '').strip()
+	try:
+		return int(float(text))
+	except ValueError:
+		return INSTALLS_UNKNOWN
+
+
+def _pack(strings):
+	encoded = [s.encode('utf-8') for s in strings]
+	offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+	np.cumsum([len(b) for b in encoded], out=offsets[1:])
+	return b''.join(encoded), offsets
+
+
+class Catalog:
+	"""Immutable columnar catalog; build with :meth:`from_db` or :meth:`from_rows`."""
+
+	__slots__ = (
+		'ids', 'ratings', 'installs', 'category_codes', 'categories',
+		'_names', '_name_offsets', '_lower', '_lower_offsets', '_row_by_id',
+	)
+
+	def __init__(self, ids, names, categories, ratings, installs):
+		self.ids = np.asarray(ids, dtype=np.int64)
+		self.ratings = np.asarray([np.nan if r is None else r for r in ratings], dtype=np.float32)
+		self.installs = np.asarray([parse_installs(v) for v in installs], dtype=np.int64)
+		# Dictionary-encode categories; code 0 means "no category"
+		self.categories = [None]
+		lookup = {None: 0}
+		codes = np.empty(len(categories), dtype=np.uint16)
+		for i, cat in enumerate(categories):
+			cat = cat or None
+			if cat not in lookup:
+				lookup[cat] = len(self.categories)
+				self.categories.append(cat)
+			codes[i] = lookup[cat]
+		self.category_codes = codes
+		names = [n or '' for n in names]
+		self._names, self._name_offsets = _pack(names)
+		# Separate lowercase buffer (lower() may change byte lengths) joined with
+		# NUL so substring matches never span two names.
+		self._lower, self._lower_offsets = _pack([n.lower() + '\0' for n in names])
+		self._row_by_id = np.argsort(self.ids, kind='stable')
+
+	@classmethod
+	def from_rows(cls, rows):
+		"""Build from ``(id, name, category, rating, installs)`` tuples."""
+		rows = list(rows)
+		if not rows:
+			return cls([], [], [], [], [])
+		ids, names, categories, ratings, installs = zip(*rows)
+		return cls(ids, names, categories, ratings, installs)
+
+	@classmethod
+	def from_db(cls):
+		return cls.from_rows(App.objects.values_list('id', 'name', 'category', 'rating', 'installs'))
+
+	def __len__(self):
+		return len(self.ids)
+
+	@property
+	def nbytes(self):
+		arrays = (self.ids, self.ratings, self.installs, self.category_codes, self._name_offsets, self._lower_offsets)
+		return sum(a.nbytes for a in arrays) + len(self._names) + len(self._lower)
+
+	def name(self, row):
+		start, end = self._name_offsets[row], self._name_offsets[row + 1]
+		return self._names[start:end].decode('utf-8')
+
+	def names(self):
+		return [self.name(i) for i in range(len(self))]
+
+	def entry(self, row):
+		row = int(row)
+		rating = float(self.ratings[row])
+		installs = int(self.installs[row])
+		return CatalogEntry(
+			id=int(self.ids[row]),
+			name=self.name(row),
+			category=self.categories[self.category_codes[row]],
+			rating=None if np.isnan(rating) else round(rating, 2),
+			installs=None if installs == INSTALLS_UNKNOWN else installs,
+		)
+
+	def entries(self, rows):
+		return [self.entry(r) for r in rows]
+
+	def row_for_id(self, app_id):
+		pos = np.searchsorted(self.ids, app_id, sorter=self._row_by_id)
+		if pos < len(self.ids) and self.ids[self._row_by_id[pos]] == app_id:
+			return int(self._row_by_id[pos])
+		return None
+
+	def search_substring(self, term, limit=10):
+		"""Rows whose name contains ``term`` (case-insensitive), in catalog order."""
+		needle = term.lower().encode('utf-8')
+		if not needle:
+			return []
+		rows = []
+		pos = self._lower.find(needle)
+		while pos != -1 and len(rows) < limit:
+			row = int(np.searchsorted(self._lower_offsets, pos, side='right')) - 1
+			rows.append(row)
+			# Jump to the next name so each row is reported once
+			pos = self._lower.find(needle, int(self._lower_offsets[row + 1]))
+		return rows
@@ -0,0 +1,80 @@
+"""Primary/replica database routing.
+
+Reads are sent to a replica only while a request is being served by a view
+marked with :func:`replica_reads` (see ``ReplicaRoutingMiddleware``); every
+other read, and all writes, go to ``default``. Only models of the apps in
+``REPLICA_APP_LABELS`` are eligible so sessions and auth always read their
+own writes from the primary.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+REPLICA_APP_LABELS = {'playstore'}
+PIN_COOKIE = 'db_pin_primary'
+
+
+class RoutingState:
+	"""Per-request routing decision, mutated by the router when a write happens."""
+	__slots__ = ('alias', 'wrote')
+
+	def __init__(self, alias=None):
+		self.alias = alias
+		self.wrote = False
+
+
+_routing_state = ContextVar('playstore_db_routing_state', default=None)
+
+
+def current_state():
+	return _routing_state.get()
+
+
+def activate(state):
+	return _routing_state.set(state)
+
+
+def deactivate(token):
+	_routing_state.reset(token)
+
+
+def choose_replica():
+	replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+	return random.choice(replicas) if replicas else None
+
+
+def replica_reads(view_func):
+	"""Mark a read-only view as safe to serve from a replica."""
+	view_func.replica_reads = True
+	return view_func
+
+
+def pin_to_primary():
+	"""Force the rest of this request (and the client's next few) onto the primary."""
+	state = current_state()
+	if state is not None:
+		state.alias = None
+		state.wrote = True
+
+
+class PrimaryReplicaRouter:
+	def db_for_read(self, model, **hints):
+		state = current_state()
+		if state is None or state.alias is None:
+			return None
+		if model._meta.app_label not in REPLICA_APP_LABELS:
+			return None
+		return state.alias
+
+	def db_for_write(self, model, **hints):
+		if model._meta.app_label in REPLICA_APP_LABELS:
+			# Read-your-writes: stay on the primary for the rest of the request
+			pin_to_primary()
+		return 'default'
+
+	def allow_relation(self, obj1, obj2, **hints):
+		pool = {'default', *getattr(settings, 'DATABASE_REPLICAS', [])}
+		if obj1._state.db in pool and obj2._state.db in pool:
+			return True
+		return None
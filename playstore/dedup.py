@@ -0,0 +1,218 @@
+"""Near-duplicate review detection with MinHash + locality-sensitive hashing.
+
+Each review's normalized text is split into character shingles and reduced to
+a ``NUM_PERM``-value MinHash signature. The signature is cut into ``BANDS``
+bands of ``ROWS`` values; every band is hashed into a ``ReviewLSHBand`` row.
+Looking up a new review is then an indexed ``bucket IN (...)`` query that only
+returns reviews sharing at least one band, followed by an exact signature
+comparison on that small candidate set.
+
+With 16 bands of 4 rows, pairs with Jaccard similarity >= ~0.5 become
+candidates; they are flagged only if the estimated similarity reaches
+``DUPLICATE_THRESHOLD``.
+"""
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+from django.db import connection, transaction
+
+from . import rollups
+from .http_cache import bump_app_version
+from .models import Review, ReviewLSHBand
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+DUPLICATE_THRESHOLD = 0.8
+DEFAULT_BATCH_SIZE = 500
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240917)  # fixed seed: signatures are persisted
+_PERM_A = _rng.integers(1, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.uint64)
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+_QUERY_CHUNK = 900  # stay well below SQLite's bound-parameter limit
+
+
+def normalize(text):
+	return _NON_WORD.sub(' ', (text or '').lower()).strip()
+
+
+def shingles(text):
+	text = normalize(text)
+	if not text:
+		return set()
+	if len(text) <= SHINGLE_SIZE:
+		return {text}
+	return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(text):
+	"""Return the MinHash signature of ``text`` (uint32 array) or None if empty."""
+	grams = shingles(text)
+	if not grams:
+		return None
+	hashed = np.fromiter(
+		(zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams),
+	) % _MERSENNE_PRIME
+	# (a * x + b) mod p for every permutation/shingle pair; products stay < 2**62.
+	perms = (_PERM_A[:, None] * hashed[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+	return perms.min(axis=1).astype(np.uint32)
+
+
+def similarity(sig_a, sig_b):
+	"""Estimated Jaccard similarity between two signatures."""
+	return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+def to_bytes(sig):
+	return b'' if sig is None else sig.astype('<u4').tobytes()
+
+
+def from_bytes(raw):
+	if not raw:
+		return None
+	return np.frombuffer(bytes(raw), dtype='<u4')
+
+
+def band_keys(sig):
+	"""Return ``[(band, bucket), ...]`` with buckets as signed 64-bit ints."""
+	keys = []
+	for band in range(BANDS):
+		chunk = sig[band * ROWS:(band + 1) * ROWS].astype('<u4').tobytes()
+		digest = hashlib.blake2b(chunk, digest_size=8, person=b'review-lsh').digest()
+		keys.append((band, int.from_bytes(digest, 'little', signed=True)))
+	return keys
+
+
+def _lookup_buckets(keys):
+	"""Map ``(band, bucket)`` -> set of indexed review ids for the given keys."""
+	found = defaultdict(set)
+	buckets = sorted({bucket for _, bucket in keys})
+	wanted = set(keys)
+	for i in range(0, len(buckets), _QUERY_CHUNK):
+		rows = ReviewLSHBand.objects.filter(bucket__in=buckets[i:i + _QUERY_CHUNK]).values_list('review_id', 'band', 'bucket')
+		for review_id, band, bucket in rows:
+			if (band, bucket) in wanted:
+				found[(band, bucket)].add(review_id)
+	return found
+
+
+def _load_signatures(review_ids):
+	sigs = {}
+	ids = sorted(review_ids)
+	for i in range(0, len(ids), _QUERY_CHUNK):
+		for rid, raw in Review.objects.filter(id__in=ids[i:i + _QUERY_CHUNK]).values_list('id', 'minhash'):
+			sigs[rid] = from_bytes(raw)
+	return sigs
+
+
+def sign(reviews):
+	"""Set ``minhash`` on (possibly unsaved) reviews so it is written on insert."""
+	for review in reviews:
+		review.minhash = to_bytes(signature(review.text))
+
+
+def _insert_bands(rows):
+	"""Plain executemany: band rows are numerous and need no ORM machinery."""
+	if not rows:
+		return
+	table = connection.ops.quote_name(ReviewLSHBand._meta.db_table)
+	columns = ', '.join(connection.ops.quote_name(c) for c in ('review_id', 'band', 'bucket'))
+	with connection.cursor() as cursor:
+		cursor.executemany(f'INSERT INTO {table} ({columns}) VALUES (%s, %s, %s)', rows)
+
+
+@transaction.atomic
+def index_reviews(reviews, threshold=DUPLICATE_THRESHOLD, presigned=False):
+	"""Sign, match and index ``reviews`` (already saved, processed in id order).
+
+	Each review is compared against everything indexed before it, including
+	earlier reviews in the same batch, and ``duplicate_of`` is set to its best
+	match at or above ``threshold``. With ``presigned`` the stored ``minhash``
+	(see :func:`sign`) is reused and only flagged rows are updated. Returns the
+	reviews that were flagged.
+	"""
+	reviews = sorted(reviews, key=lambda r: r.id)
+	if presigned:
+		sigs = {r.id: from_bytes(r.minhash) for r in reviews}
+	else:
+		sigs = {r.id: signature(r.text) for r in reviews}
+	keys = {rid: band_keys(sig) for rid, sig in sigs.items() if sig is not None}
+	buckets = _lookup_buckets([k for ks in keys.values() for k in ks])
+	known = _load_signatures(set().union(*buckets.values()) if buckets else set())
+
+	flagged = []
+	new_bands = []
+	for review in reviews:
+		sig = sigs[review.id]
+		review.minhash = to_bytes(sig)
+		review.duplicate_of_id = None
+		review.duplicate_score = None
+		if sig is None:
+			continue
+		candidates = set()
+		for key in keys[review.id]:
+			candidates |= buckets.get(key, set())
+		candidates.discard(review.id)
+		best_id, best_score = None, 0.0
+		for cid in sorted(candidates):
+			other = known.get(cid)
+			if other is None:
+				continue
+			score = similarity(sig, other)
+			if score > best_score:
+				best_id, best_score = cid, score
+		if best_id is not None and best_score >= threshold:
+			review.duplicate_of_id = best_id
+			review.duplicate_score = best_score
+			flagged.append(review)
+		known[review.id] = sig
+		for band, bucket in keys[review.id]:
+			buckets[(band, bucket)].add(review.id)
+			new_bands.append((review.id, band, bucket))
+
+	if presigned:
+		Review.objects.bulk_update(flagged, ['duplicate_of', 'duplicate_score'])
+	else:
+		Review.objects.bulk_update(reviews, ['minhash', 'duplicate_of', 'duplicate_score'])
+	_insert_bands(new_bands)
+	return flagged
+
+
+def index_pending(batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+	"""Index reviews that have no signature yet, in resumable id-ordered batches.
+
+	Returns ``(processed, flagged)`` counts.
+	"""
+	processed = flagged = batches = 0
+	while max_batches is None or batches < max_batches:
+		batch = list(
+			Review.objects.filter(minhash__isnull=True).order_by('id').only('id', 'text')[:batch_size]
+		)
+		if not batch:
+			break
+		flagged += len(index_reviews(batch))
+		processed += len(batch)
+		batches += 1
+	return processed, flagged
+
+
+def discard_reviews(reviews):
+	"""Delete reviews, first retracting them from rollups and app page versions.
+
+	Returns the number of reviews deleted.
+	"""
+	reviews = list(reviews)
+	if not reviews:
+		return 0
+	with transaction.atomic():
+		rollups.retract_reviews(reviews)
+		Review.objects.filter(id__in=[r.id for r in reviews]).delete()
+		for app_id in {r.app_id for r in reviews if r.approved}:
+			bump_app_version(app_id)
+	return len(reviews)
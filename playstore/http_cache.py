@@ -0,0 +1,98 @@
+"""HTTP validators (ETag / Last-Modified) and Cache-Control for cacheable views.
+
+Validators are cheap single-row or index-only queries, evaluated by Django's
+``condition`` machinery before the view body runs, so an unchanged page is
+answered with 304 without touching templates or review queries.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import Count, F, Max
+from django.utils import timezone
+from django.utils.cache import add_never_cache_headers, patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import App
+
+
+def bump_app_version(app_id):
+	"""Invalidate cached copies of an app page (e.g. after a review approval)."""
+	App.objects.filter(pk=app_id).update(
+		content_version=F('content_version') + 1,
+		content_updated_at=timezone.now(),
+	)
+
+
+def catalog_version():
+	"""Return ``(app_count, newest metadata_updated_at)`` for the whole catalog.
+
+	Changes whenever apps are added, removed or edited, which is exactly when
+	the search index and autocomplete answers can change. Review approvals
+	only bump the per-app ``content_version`` and leave this untouched.
+	"""
+	agg = App.objects.aggregate(n=Count('id'), ts=Max('metadata_updated_at'))
+	return agg['n'], agg['ts']
+
+
+def _has_pending_messages(request):
+	# len() does not mark the storage as used, so messages still render.
+	return hasattr(request, '_messages') and len(get_messages(request)) > 0
+
+
+def _app_validators(request, app_id):
+	cached = getattr(request, '_app_validators', None)
+	if cached is None:
+		cached = (None, None)
+		if not _has_pending_messages(request):
+			row = App.objects.filter(pk=app_id).values_list('content_version', 'content_updated_at').first()
+			if row is not None:
+				version, updated = row
+				cached = (f'app-{app_id}-{settings.HTTP_CACHE_VERSION}-{version}', updated)
+		request._app_validators = cached
+	return cached
+
+
+def app_etag(request, app_id):
+	return _app_validators(request, app_id)[0]
+
+
+def app_last_modified(request, app_id):
+	return _app_validators(request, app_id)[1]
+
+
+def request_catalog_version(request):
+	"""``catalog_version()`` memoized on the request (shared by validators and views)."""
+	cached = getattr(request, '_catalog_version', None)
+	if cached is None:
+		cached = request._catalog_version = catalog_version()
+	return cached
+
+
+def catalog_validators(version):
+	"""``(etag, last_modified)`` for content derived from catalog ``version``."""
+	count, updated = version
+	ts = int(updated.timestamp()) if updated else 0
+	return f'catalog-{settings.HTTP_CACHE_VERSION}-{count}-{ts}', updated
+
+
+def conditional_view(etag_func, last_modified_func=None, **cache_control):
+	"""Django's ``condition`` plus Cache-Control on both 200 and 304 responses.
+
+	When ``etag_func`` yields no ETag (e.g. a flash message must be shown) the
+	response is marked uncacheable instead.
+	"""
+	def decorator(view_func):
+		conditional = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+
+		@wraps(view_func)
+		def _wrapped(request, *args, **kwargs):
+			response = conditional(request, *args, **kwargs)
+			if request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+				if response.has_header('ETag'):
+					patch_cache_control(response, **cache_control)
+				else:
+					add_never_cache_headers(response)
+			return response
+		return _wrapped
+	return decorator
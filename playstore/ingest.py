@@ -0,0 +1,176 @@
+"""Bulk review ingestion for partner feeds.
+
+A batch is parsed from JSON (a list, or ``{"reviews": [...]}``) or NDJSON,
+validated column-wise with pandas, resolved to app ids with a single query
+and written with one ``bulk_create``. Accepted reviews enter the moderation
+queue unapproved and are run through near-duplicate detection as a batch.
+"""
+import hashlib
+import json
+import secrets
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import dedup
+from .models import App, PartnerKey, Review
+
+FIELDS = ['app', 'text', 'sentiment', 'sentiment_polarity', 'sentiment_subjectivity']
+SENTIMENTS = {'positive', 'negative', 'neutral'}
+MAX_TEXT_LENGTH = 5000
+
+
+class IngestError(Exception):
+	"""Whole-batch failure; ``status`` is the HTTP status to answer with."""
+
+	def __init__(self, message, status=400):
+		super().__init__(message)
+		self.status = status
+
+
+def hash_key(raw_key):
+	return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+
+
+def create_partner_key(user, name):
+	"""Create a key for ``user`` and return ``(PartnerKey, raw_key)``; the raw key is not stored."""
+	raw_key = f'psk_{secrets.token_urlsafe(32)}'
+	key = PartnerKey.objects.create(user=user, name=name, prefix=raw_key[:12], key_hash=hash_key(raw_key))
+	return key, raw_key
+
+
+def authenticate(request):
+	"""Return the active PartnerKey named by ``Authorization: Bearer <key>``, or None."""
+	scheme, _, raw_key = request.headers.get('Authorization', '').partition(' ')
+	if scheme.lower() != 'bearer' or not raw_key.strip():
+		return None
+	key = PartnerKey.objects.select_related('user').filter(key_hash=hash_key(raw_key.strip()), is_active=True).first()
+	if key is not None:
+		PartnerKey.objects.filter(pk=key.pk).update(last_used_at=timezone.now())
+	return key
+
+
+def parse_items(body, content_type):
+	"""Decode a JSON or NDJSON request body into a list of items."""
+	try:
+		text = body.decode('utf-8')
+	except UnicodeDecodeError:
+		raise IngestError('Body must be UTF-8.')
+	if 'ndjson' in content_type or 'jsonlines' in content_type:
+		items = []
+		for lineno, line in enumerate(text.splitlines(), start=1):
+			if not line.strip():
+				continue
+			try:
+				items.append(json.loads(line))
+			except ValueError:
+				raise IngestError(f'Invalid JSON on line {lineno}.')
+	else:
+		try:
+			payload = json.loads(text)
+		except ValueError:
+			raise IngestError('Invalid JSON body.')
+		items = payload.get('reviews') if isinstance(payload, dict) else payload
+		if not isinstance(items, list):
+			raise IngestError('Expected a JSON list of reviews or {"reviews": [...]}.')
+	if not items:
+		raise IngestError('No reviews supplied.')
+	if len(items) > settings.INGEST_MAX_BATCH:
+		raise IngestError(f'Batch too large; at most {settings.INGEST_MAX_BATCH} reviews per request.', status=413)
+	return items
+
+
+def _string_column(series):
+	"""Stripped strings; anything that is not a string becomes NA."""
+	return series.where(series.map(type).eq(str)).astype('string').str.strip()
+
+
+def _numeric_column(series):
+	"""Floats; JSON booleans (which to_numeric would accept as 0/1) and non-numbers become NaN."""
+	return pd.to_numeric(series.mask(series.map(type).eq(bool)), errors='coerce')
+
+
+def _mask(series):
+	"""Boolean numpy mask treating NA as False."""
+	return series.to_numpy(dtype=bool, na_value=False)
+
+
+def _validate(items):
+	"""Return ``(frame, errors)`` where ``errors[i]`` lists problems with item ``i``."""
+	is_obj = np.fromiter((isinstance(item, dict) for item in items), dtype=bool, count=len(items))
+	records = [item if ok else {} for item, ok in zip(items, is_obj)]
+	# Explicit index/columns: all-empty records would otherwise give a 0-row frame
+	raw = pd.DataFrame.from_records(records, index=range(len(items)), columns=FIELDS)
+
+	df = pd.DataFrame(index=raw.index)
+	df['app'] = _string_column(raw['app'])
+	df['text'] = _string_column(raw['text'])
+	sentiment = _string_column(raw['sentiment']).str.lower()
+	df['sentiment'] = sentiment.str.capitalize()
+	df['sentiment_polarity'] = _numeric_column(raw['sentiment_polarity'])
+	df['sentiment_subjectivity'] = _numeric_column(raw['sentiment_subjectivity'])
+
+	checks = [
+		(~is_obj, 'item must be a JSON object'),
+		(is_obj & ~_mask(df['app'].str.len().gt(0)), 'app is required'),
+		(is_obj & ~_mask(df['text'].str.len().gt(0)), 'text is required'),
+		(_mask(df['text'].str.len().gt(MAX_TEXT_LENGTH)), f'text longer than {MAX_TEXT_LENGTH} characters'),
+		(_mask(raw['sentiment'].notna()) & ~_mask(sentiment.isin(SENTIMENTS)), 'sentiment must be positive, negative or neutral'),
+		(_mask(raw['sentiment_polarity'].notna()) & ~_mask(df['sentiment_polarity'].between(-1, 1)), 'sentiment_polarity must be a number in [-1, 1]'),
+		(_mask(raw['sentiment_subjectivity'].notna()) & ~_mask(df['sentiment_subjectivity'].between(0, 1)), 'sentiment_subjectivity must be a number in [0, 1]'),
+	]
+	errors = [[] for _ in items]
+	for mask, message in checks:
+		for i in np.flatnonzero(mask):
+			errors[i].append(message)
+	return df, errors
+
+
+def _resolve_apps(names):
+	"""Map app names to ids with one query; duplicate names resolve to the lowest id."""
+	mapping = {}
+	for name, app_id in App.objects.filter(name__in=names).order_by('-id').values_list('name', 'id'):
+		mapping[name] = app_id
+	return mapping
+
+
+def ingest(items, user):
+	"""Validate and insert ``items``; return per-item results in input order."""
+	df, errors = _validate(items)
+	valid = np.array([not e for e in errors], dtype=bool)
+	names = df.loc[valid, 'app'].unique().tolist()
+	app_ids = df['app'].map(_resolve_apps(names) if names else {})
+	for i in np.flatnonzero(valid & _mask(app_ids.isna())):
+		errors[i].append('unknown app')
+	valid &= _mask(app_ids.notna())
+
+	rows = np.flatnonzero(valid)
+	accepted = df.iloc[rows].astype(object).where(df.iloc[rows].notna(), None)
+	reviews = [
+		Review(
+			app_id=int(app_id), user=user, text=text, sentiment=sentiment,
+			sentiment_polarity=polarity, sentiment_subjectivity=subjectivity, approved=False,
+		)
+		for app_id, text, sentiment, polarity, subjectivity in zip(
+			app_ids.iloc[rows], accepted['text'], accepted['sentiment'],
+			accepted['sentiment_polarity'], accepted['sentiment_subjectivity'],
+		)
+	]
+	flagged = set()
+	if reviews:
+		# Sign before inserting so signatures go out with the INSERT itself
+		dedup.sign(reviews)
+		with transaction.atomic():
+			created = Review.objects.bulk_create(reviews, batch_size=settings.INGEST_INSERT_BATCH)
+			flagged = {r.id for r in dedup.index_reviews(created, presigned=True)}
+
+	results = [{'index': i, 'status': 'rejected', 'errors': e} for i, e in enumerate(errors)]
+	for i, review in zip(rows, reviews):
+		result = {'index': int(i), 'status': 'queued', 'id': review.id}
+		if review.id in flagged:
+			result['duplicate_of'] = review.duplicate_of_id
+		results[i] = result
+	return results
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from playstore import rollups
+
+
+class Command(BaseCommand):
+    help = "Fold approved reviews into the daily sentiment rollups (resumable, batched)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=rollups.DEFAULT_BATCH_SIZE,
+                            help="Reviews per transaction (default: %(default)s)")
+        parser.add_argument("--max-batches", type=int, default=None,
+                            help="Stop after this many batches; re-run to continue")
+        parser.add_argument("--rebuild", action="store_true",
+                            help="Drop existing rollups and recompute from scratch")
+
+    def handle(self, *args, **options):
+        batch_size: int = options["batch_size"]
+        if batch_size <= 0:
+            raise CommandError("--batch-size must be positive.")
+
+        if options["rebuild"]:
+            rollups.reset_rollups()
+            self.stdout.write(self.style.WARNING("Existing rollups cleared."))
+
+        processed = rollups.rollup_pending(batch_size=batch_size, max_batches=options["max_batches"])
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {processed} review(s)."))
@@ -0,0 +1,96 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from playstore.catalog import Catalog
+from playstore.semantic import IVFIndex, SemanticIndex, _normalize
+
+
+def _synthetic(n, dim, clusters, seed):
+    """Unit vectors drawn around ``clusters`` random topics (LSA vectors are clumpy, not uniform)."""
+    rng = np.random.default_rng(seed)
+    topics = _normalize(rng.standard_normal((clusters, dim)))
+    vectors = np.empty((n, dim), dtype=np.float32)
+    spread = 0.8 / np.sqrt(dim)  # within-topic noise with norm ~0.8
+    chunk = 100000
+    for start in range(0, n, chunk):
+        size = min(chunk, n - start)
+        block = topics[rng.integers(0, clusters, size)] + spread * rng.standard_normal((size, dim), dtype=np.float32)
+        vectors[start:start + size] = _normalize(block)
+    return vectors
+
+
+class Command(BaseCommand):
+    help = "Measure IVF recall@k and latency against exact search, on synthetic vectors or the live catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--synthetic", type=int, default=None,
+                            help="Benchmark N synthetic vectors instead of the live catalog")
+        parser.add_argument("--dim", type=int, default=128,
+                            help="Dimensions of synthetic vectors (default: %(default)s)")
+        parser.add_argument("--nlist", type=int, default=None,
+                            help="IVF clusters (default: sqrt(N))")
+        parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32],
+                            help="nprobe values to measure (default: %(default)s)")
+        parser.add_argument("--queries", type=int, default=200,
+                            help="Number of queries (default: %(default)s)")
+        parser.add_argument("-k", type=int, default=10,
+                            help="Neighbours per query (default: %(default)s)")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        k: int = options["k"]
+        if k <= 0 or options["queries"] <= 0:
+            raise CommandError("-k and --queries must be positive.")
+        rng = np.random.default_rng(options["seed"])
+
+        if options["synthetic"]:
+            n = options["synthetic"]
+            started = time.perf_counter()
+            vectors = _synthetic(n, options["dim"], clusters=max(16, n // 2000), seed=options["seed"])
+            self.stdout.write(f"Generated {n} x {options['dim']} vectors in {time.perf_counter() - started:.1f}s")
+            started = time.perf_counter()
+            ivf = IVFIndex.build(vectors, nlist=options["nlist"], seed=options["seed"])
+            del vectors
+        else:
+            catalog = Catalog.from_db()
+            started = time.perf_counter()
+            semantic = SemanticIndex.build(catalog)
+            if semantic is None:
+                raise CommandError("Catalog is too small to build a semantic index.")
+            ivf = semantic.ivf
+            if options["nlist"]:
+                ivf = IVFIndex.build(ivf.vectors, nlist=options["nlist"], seed=options["seed"])
+        self.stdout.write(
+            f"Built IVF over {len(ivf)} vectors (nlist={ivf.nlist}, {ivf.nbytes / 2**20:.1f} MiB) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        # Queries are perturbed copies of indexed vectors, like a query close to some apps
+        picks = ivf.vectors[rng.choice(len(ivf), options["queries"], replace=False)]
+        noise = (0.3 / np.sqrt(picks.shape[1])) * rng.standard_normal(picks.shape, dtype=np.float32)
+        queries = _normalize(picks + noise)
+
+        # Recall is scored by similarity, not ids: the catalog has many identical
+        # documents, and any of a set of tied vectors is an equally correct answer
+        thresholds, exact_ms = [], []
+        for q in queries:
+            started = time.perf_counter()
+            _, scores = ivf.exact(q, k)
+            exact_ms.append((time.perf_counter() - started) * 1000)
+            thresholds.append(scores[-1] - 1e-6)
+        self.stdout.write(f"exact: p50 {np.median(exact_ms):.2f} ms, p95 {np.percentile(exact_ms, 95):.2f} ms")
+
+        self.stdout.write(f"{'nprobe':>6}  {'recall@' + str(k):>9}  {'p50 ms':>7}  {'p95 ms':>7}")
+        for nprobe in options["nprobe"]:
+            hits, latencies = 0, []
+            for q, threshold in zip(queries, thresholds):
+                started = time.perf_counter()
+                _, scores = ivf.search(q, k=k, nprobe=nprobe)
+                latencies.append((time.perf_counter() - started) * 1000)
+                hits += int((scores >= threshold).sum())
+            recall = hits / (k * len(queries))
+            self.stdout.write(
+                f"{nprobe:>6}  {recall:>9.3f}  {np.median(latencies):>7.2f}  {np.percentile(latencies, 95):>7.2f}"
+            )
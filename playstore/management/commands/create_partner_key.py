@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+
+from playstore import ingest
+from playstore.models import PartnerKey
+
+
+class Command(BaseCommand):
+    help = "Issue (or revoke) an API key for the partner batch review ingestion endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", type=str, help="User the ingested reviews are attributed to")
+        parser.add_argument("--name", type=str, default=None, help="Label for the key (default: username)")
+        parser.add_argument("--revoke", action="store_true", help="Deactivate all of the user's keys instead")
+
+    def handle(self, *args, **options):
+        username: str = options["username"]
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"User '{username}' does not exist.")
+
+        if options["revoke"]:
+            revoked = PartnerKey.objects.filter(user=user, is_active=True).update(is_active=False)
+            self.stdout.write(self.style.SUCCESS(f"Revoked {revoked} key(s) for '{username}'."))
+            return
+
+        key, raw_key = ingest.create_partner_key(user, options["name"] or username)
+        self.stdout.write(self.style.SUCCESS(f"Created key '{key.name}' for '{username}'."))
+        self.stdout.write("Store it now; it cannot be shown again:")
+        self.stdout.write(raw_key)
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from playstore import dedup
+from playstore.models import Review
+
+
+class Command(BaseCommand):
+    help = "Sign reviews with MinHash, index them for LSH lookup and flag near-duplicates (resumable, batched)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=dedup.DEFAULT_BATCH_SIZE,
+                            help="Reviews per batch (default: %(default)s)")
+        parser.add_argument("--max-batches", type=int, default=None,
+                            help="Stop after this many batches; re-run to continue")
+        parser.add_argument("--delete", action="store_true",
+                            help="Delete every review flagged as a near-duplicate after indexing")
+
+    def handle(self, *args, **options):
+        batch_size: int = options["batch_size"]
+        if batch_size <= 0:
+            raise CommandError("--batch-size must be positive.")
+
+        processed, flagged = dedup.index_pending(batch_size=batch_size, max_batches=options["max_batches"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {processed} review(s); flagged {flagged} near-duplicate(s)."))
+
+        if options["delete"]:
+            duplicates = Review.objects.filter(duplicate_of__isnull=False).only(
+                "id", "app_id", "approved", "rolled_up", "created_at",
+                "sentiment", "sentiment_polarity", "sentiment_subjectivity",
+            )
+            deleted = 0
+            batch = list(duplicates[:batch_size])
+            while batch:
+                deleted += dedup.discard_reviews(batch)
+                batch = list(duplicates[:batch_size])
+            self.stdout.write(self.style.WARNING(f"Deleted {deleted} near-duplicate review(s)."))
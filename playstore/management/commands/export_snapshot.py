@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from playstore import analytics
+
+
+class Command(BaseCommand):
+    help = "Export apps and reviews to a typed Parquet snapshot for the analytics dashboard."
+
+    def add_arguments(self, parser):
+        replicas = getattr(settings, "DATABASE_REPLICAS", [])
+        parser.add_argument("--database", default=replicas[0] if replicas else "default",
+                            help="Database alias to read from (default: %(default)s)")
+        parser.add_argument("--chunk-size", type=int, default=analytics.EXPORT_CHUNK_SIZE,
+                            help="Rows per fetch / Parquet row group (default: %(default)s)")
+        parser.add_argument("--keep", type=int, default=settings.ANALYTICS_SNAPSHOT_KEEP,
+                            help="Snapshots to retain (default: %(default)s)")
+
+    def handle(self, *args, **options):
+        if options["database"] not in settings.DATABASES:
+            raise CommandError(f"Unknown database alias {options['database']!r}.")
+        if options["chunk_size"] <= 0 or options["keep"] <= 0:
+            raise CommandError("--chunk-size and --keep must be positive.")
+
+        manifest = analytics.export_snapshot(
+            using=options["database"], chunk_size=options["chunk_size"], keep=options["keep"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot {manifest['name']}: {manifest['apps']} app(s), {manifest['reviews']} review(s) "
+            f"from {manifest['source']!r} in {analytics.snapshot_root()}."
+        ))
@@ -2,6 +2,7 @@
 import pandas as pd
 from django.core.management.base import BaseCommand
 from playstore.models import App, Review
+from playstore import rollups
 from django.contrib.auth.models import User
 import sys
 import os
@@ -59,3 +60,7 @@ class Command(BaseCommand):
                     approved=True
                 )
         self.stdout.write(self.style.SUCCESS('Reviews loaded.'))
+
+        # Seed daily sentiment rollups for the imported (pre-approved) reviews
+        processed = rollups.rollup_pending()
+        self.stdout.write(self.style.SUCCESS(f'Sentiment rollups updated ({processed} reviews).'))
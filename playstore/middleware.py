@@ -0,0 +1,94 @@
+import random
+import threading
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import db_routers
+from .profiling import ProfilerUnavailable, ProfileSession
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_PARAM = '_profile'
+
+# cProfile is process-wide on Python 3.12+: profile one request at a time
+_profiling = threading.Lock()
+
+
+class ReplicaRoutingMiddleware:
+	"""Scope replica routing to a single request.
+
+	Views decorated with ``db_routers.replica_reads`` read from a replica on
+	GET/HEAD unless the client recently wrote, in which case a short-lived
+	cookie pins it to the primary so it sees its own review or approval.
+	"""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		state = db_routers.RoutingState()
+		token = db_routers.activate(state)
+		try:
+			response = self.get_response(request)
+		finally:
+			db_routers.deactivate(token)
+		if state.wrote and settings.DATABASE_REPLICAS:
+			response.set_cookie(
+				db_routers.PIN_COOKIE, '1',
+				max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+				httponly=True, samesite='Lax',
+			)
+		return response
+
+	def process_view(self, request, view_func, view_args, view_kwargs):
+		if not getattr(view_func, 'replica_reads', False):
+			return None
+		if request.method not in ('GET', 'HEAD') or request.COOKIES.get(db_routers.PIN_COOKIE):
+			return None
+		state = db_routers.current_state()
+		if state is not None and not state.wrote:
+			state.alias = db_routers.choose_replica()
+		return None
+
+
+class RequestProfilerMiddleware:
+	"""Profile selected requests with cProfile + SQL capture (see profiling.py).
+
+	Staff trigger a run with an ``X-Profile: 1`` header or ``?_profile=1``;
+	``PROFILE_SAMPLE_RATE`` additionally samples any request. With
+	``PROFILE_ENABLED`` off the middleware removes itself at startup, and for
+	unselected requests it only performs a header/parameter check. A request
+	selected while another one is being profiled is served unprofiled.
+	"""
+
+	def __init__(self, get_response):
+		if not settings.PROFILE_ENABLED:
+			raise MiddlewareNotUsed
+		self.get_response = get_response
+		self.sample_rate = settings.PROFILE_SAMPLE_RATE
+
+	def __call__(self, request):
+		trigger = self._trigger(request)
+		if trigger is None or not _profiling.acquire(blocking=False):
+			return self.get_response(request)
+		try:
+			try:
+				with ProfileSession() as session:
+					response = self.get_response(request)
+			except ProfilerUnavailable:
+				return self.get_response(request)
+			name = session.save(request, response, trigger)
+		finally:
+			_profiling.release()
+		if trigger == 'staff':
+			response['X-Profile-Id'] = name
+		return response
+
+	def _trigger(self, request):
+		if request.headers.get(PROFILE_HEADER) == '1' or request.GET.get(PROFILE_PARAM) == '1':
+			user = getattr(request, 'user', None)
+			if user is not None and user.is_staff:
+				return 'staff'
+		if self.sample_rate and random.random() < self.sample_rate:
+			return 'sample'
+		return None
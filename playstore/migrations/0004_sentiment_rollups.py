@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playstore', '0003_app_name_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='rolled_up',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='AppSentimentDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('sentiment', models.CharField(max_length=20)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('polarity_sum', models.FloatField(default=0.0)),
+                ('polarity_n', models.PositiveIntegerField(default=0)),
+                ('subjectivity_sum', models.FloatField(default=0.0)),
+                ('subjectivity_n', models.PositiveIntegerField(default=0)),
+                ('app', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sentiment_daily', to='playstore.app')),
+            ],
+            options={
+                'ordering': ['app', 'day', 'sentiment'],
+                'constraints': [models.UniqueConstraint(fields=('app', 'day', 'sentiment'), name='app_sentiment_day_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playstore', '0004_sentiment_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='app',
+            name='content_updated_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='app',
+            name='content_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playstore', '0005_app_content_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='near_duplicates', to='playstore.review'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='duplicate_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ReviewLSHBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_bands', to='playstore.review')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket', 'band'], name='review_lsh_bucket_idx')],
+            },
+        ),
+    ]
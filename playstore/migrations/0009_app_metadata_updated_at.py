@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playstore', '0008_partner_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='app',
+            name='metadata_updated_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
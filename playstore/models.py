@@ -1,6 +1,7 @@
 
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 """Core data models for Play Store review application.
 
@@ -9,6 +10,9 @@ Models:
 	Review: User (or imported) review with optional sentiment fields.
 	ReviewApproval: Supervisor approval audit record.
 	UserProfile: Extension flags for auth.User (e.g., supervisor role).
+	AppSentimentDaily: Per-app, per-day, per-sentiment review rollup.
+	ReviewLSHBand: MinHash LSH bucket entries used for near-duplicate lookup.
+	PartnerKey: Hashed API key for bulk review ingestion by partners.
 """
 
 class App(models.Model):
@@ -30,6 +34,13 @@ class App(models.Model):
 	last_updated = models.CharField(max_length=50, blank=True, null=True)
 	current_ver = models.CharField(max_length=50, blank=True, null=True)
 	android_ver = models.CharField(max_length=50, blank=True, null=True)
+	# Bumped on every metadata save and review approval; drives HTTP ETags
+	# and Last-Modified for the app page (see playstore/http_cache.py).
+	content_version = models.PositiveIntegerField(default=0)
+	content_updated_at = models.DateTimeField(blank=True, null=True, db_index=True)
+	# Set only by metadata saves (not review approvals); keys the search
+	# index and autocomplete caches via http_cache.catalog_version().
+	metadata_updated_at = models.DateTimeField(blank=True, null=True, db_index=True)
 
 	class Meta:
 		ordering = ["name"]
@@ -40,6 +51,14 @@ class App(models.Model):
 	def __str__(self):  # pragma: no cover - str repr
 		return self.name
 
+	def save(self, *args, **kwargs):
+		self.content_version = (self.content_version or 0) + 1
+		self.content_updated_at = self.metadata_updated_at = timezone.now()
+		update_fields = kwargs.get('update_fields')
+		if update_fields is not None:
+			kwargs['update_fields'] = {*update_fields, 'content_version', 'content_updated_at', 'metadata_updated_at'}
+		super().save(*args, **kwargs)
+
 class Review(models.Model):
 	app = models.ForeignKey(App, on_delete=models.CASCADE, related_name='reviews')
 	user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
@@ -49,10 +68,40 @@ class Review(models.Model):
 	sentiment_subjectivity = models.FloatField(blank=True, null=True)
 	created_at = models.DateTimeField(auto_now_add=True)
 	approved = models.BooleanField(default=False)
+	# Set once the review has been folded into AppSentimentDaily so rollups
+	# are applied exactly once (see playstore/rollups.py).
+	rolled_up = models.BooleanField(default=False)
+	# Near-duplicate detection (see playstore/dedup.py). ``minhash`` is the
+	# packed signature; empty bytes mark text too short to sign.
+	minhash = models.BinaryField(blank=True, null=True, editable=False)
+	duplicate_of = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='near_duplicates')
+	duplicate_score = models.FloatField(blank=True, null=True)
+	# Moderation lease (see playstore/moderation.py); both null when unclaimed.
+	claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='claimed_reviews')
+	claim_expires_at = models.DateTimeField(blank=True, null=True)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["approved", "claim_expires_at"], name="review_queue_idx"),
+		]
 
 	def __str__(self):  # pragma: no cover
 		return f"{self.app.name} - {self.text[:30]}"
 
+class ReviewLSHBand(models.Model):
+	"""One LSH band hash of a review's MinHash signature.
+
+	Reviews sharing any (band, bucket) pair are near-duplicate candidates.
+	"""
+	review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='lsh_bands')
+	band = models.PositiveSmallIntegerField()
+	bucket = models.BigIntegerField()
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["bucket", "band"], name="review_lsh_bucket_idx"),
+		]
+
 class ReviewApproval(models.Model):
 	review = models.OneToOneField(Review, on_delete=models.CASCADE)
 	supervisor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='approvals')
@@ -68,3 +117,51 @@ class UserProfile(models.Model):
 
 	def __str__(self):  # pragma: no cover
 		return f"{self.user.username} (Supervisor: {self.is_supervisor})"
+
+class AppSentimentDaily(models.Model):
+	"""Daily sentiment rollup for one app.
+
+	Stores running sums rather than means so approved reviews can be added
+	incrementally; means are derived on read.
+	"""
+	app = models.ForeignKey(App, on_delete=models.CASCADE, related_name='sentiment_daily')
+	day = models.DateField()
+	sentiment = models.CharField(max_length=20)
+	review_count = models.PositiveIntegerField(default=0)
+	polarity_sum = models.FloatField(default=0.0)
+	polarity_n = models.PositiveIntegerField(default=0)
+	subjectivity_sum = models.FloatField(default=0.0)
+	subjectivity_n = models.PositiveIntegerField(default=0)
+
+	class Meta:
+		ordering = ["app", "day", "sentiment"]
+		constraints = [
+			models.UniqueConstraint(fields=["app", "day", "sentiment"], name="app_sentiment_day_uniq"),
+		]
+
+	@property
+	def mean_polarity(self):
+		return self.polarity_sum / self.polarity_n if self.polarity_n else None
+
+	@property
+	def mean_subjectivity(self):
+		return self.subjectivity_sum / self.subjectivity_n if self.subjectivity_n else None
+
+	def __str__(self):  # pragma: no cover
+		return f"{self.app_id} {self.day} {self.sentiment}: {self.review_count}"
+
+class PartnerKey(models.Model):
+	"""API key for the batch ingestion endpoint; only the SHA-256 is stored.
+
+	Reviews ingested with the key are attributed to ``user``.
+	"""
+	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='partner_keys')
+	name = models.CharField(max_length=100)
+	prefix = models.CharField(max_length=12)
+	key_hash = models.CharField(max_length=64, unique=True)
+	is_active = models.BooleanField(default=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+	last_used_at = models.DateTimeField(blank=True, null=True)
+
+	def __str__(self):  # pragma: no cover
+		return f"{self.name} ({self.prefix}…)"
@@ -0,0 +1,93 @@
+"""Lease-based work distribution for concurrent supervisors.
+
+Each supervisor claims a batch of pending reviews for a limited time. On
+Postgres the batch is picked with ``SELECT ... FOR UPDATE SKIP LOCKED`` so
+concurrent claimers never wait on or receive the same rows. Backends without
+SKIP LOCKED (SQLite) fall back to a conditional UPDATE that re-checks the
+"unclaimed or expired" predicate; SQLite serializes writers, so a row can
+still only be won once. Expired leases simply become claimable again.
+Approval re-checks the lease, so a review leased to one supervisor cannot
+be approved by another.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import rollups
+from .http_cache import bump_app_version
+from .models import Review, ReviewApproval
+
+
+# approve() outcomes
+APPROVED = 'approved'
+ALREADY_APPROVED = 'already_approved'
+LEASED_ELSEWHERE = 'leased_elsewhere'
+
+
+def _claimable(now):
+	return Q(approved=False) & (Q(claim_expires_at__isnull=True) | Q(claim_expires_at__lte=now))
+
+
+def active_claims(user, now=None):
+	now = now or timezone.now()
+	return Review.objects.filter(approved=False, claimed_by=user, claim_expires_at__gt=now)
+
+
+def claim_batch(user, batch_size=None, lease_seconds=None):
+	"""Renew ``user``'s unexpired claims and top them up to ``batch_size``.
+
+	Returns the number of newly claimed reviews.
+	"""
+	batch_size = batch_size or settings.MODERATION_BATCH_SIZE
+	lease_seconds = lease_seconds or settings.MODERATION_LEASE_SECONDS
+	now = timezone.now()
+	expires = now + timedelta(seconds=lease_seconds)
+	with transaction.atomic():
+		held = active_claims(user, now).update(claim_expires_at=expires)
+		needed = batch_size - held
+		if needed <= 0:
+			return 0
+		candidates = Review.objects.filter(_claimable(now)).order_by('id')
+		if connection.features.has_select_for_update_skip_locked:
+			candidates = candidates.select_for_update(skip_locked=True)
+		ids = list(candidates.values_list('id', flat=True)[:needed])
+		if not ids:
+			return 0
+		return Review.objects.filter(_claimable(now), id__in=ids).update(
+			claimed_by=user, claim_expires_at=expires,
+		)
+
+
+def release_claims(user):
+	"""Hand ``user``'s unfinished claims back to the pool."""
+	return Review.objects.filter(approved=False, claimed_by=user).update(claimed_by=None, claim_expires_at=None)
+
+
+def approve(review_id, supervisor):
+	"""Approve a pending review exactly once, honouring leases.
+
+	The compare-and-set succeeds only while ``supervisor`` holds the lease or
+	the review is unleased (never claimed, or the lease expired); a review
+	leased to someone else is left alone. Returns ``APPROVED``,
+	``ALREADY_APPROVED`` or ``LEASED_ELSEWHERE``.
+	"""
+	now = timezone.now()
+	with transaction.atomic():
+		won = Review.objects.filter(
+			Q(claimed_by=supervisor, claim_expires_at__gt=now) | _claimable(now),
+			id=review_id, approved=False,
+		).update(approved=True, claimed_by=None, claim_expires_at=None)
+		if not won:
+			if Review.objects.filter(id=review_id, approved=True).exists():
+				return ALREADY_APPROVED
+			return LEASED_ELSEWHERE
+		review = Review.objects.get(id=review_id)
+		ReviewApproval.objects.get_or_create(
+			review=review, defaults={'supervisor': supervisor, 'approved': True},
+		)
+		rollups.record_review(review)
+		bump_app_version(review.app_id)
+	return APPROVED
@@ -0,0 +1,169 @@
+"""On-demand request profiling with reports saved to disk.
+
+A profiled request runs under cProfile while every SQL statement (on every
+configured database alias) is recorded with its duration and the first
+project frame that issued it. Each run is written to ``PROFILE_DIR`` as a
+raw ``.prof`` file (loadable with pstats/snakeviz) next to a ``.json``
+summary that the staff views in ``views.py`` list and render.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import time
+import traceback
+import uuid
+from contextlib import ExitStack
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+_REPORT_NAME = re.compile(r'^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$')
+_PROJECT_ROOT = str(Path(settings.BASE_DIR).resolve())
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def profile_dir():
+	path = Path(settings.PROFILE_DIR)
+	path.mkdir(parents=True, exist_ok=True)
+	return path
+
+
+def _call_site():
+	"""Innermost stack frame that belongs to project code (not Django/site-packages)."""
+	for frame in reversed(traceback.extract_stack()):
+		filename = os.path.abspath(frame.filename)
+		if filename == _THIS_FILE or not filename.startswith(_PROJECT_ROOT):
+			continue
+		if 'site-packages' in filename:
+			continue
+		return f'{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.lineno} in {frame.name}'
+	return None
+
+
+class _QueryRecorder:
+	def __init__(self, alias):
+		self.alias = alias
+		self.queries = []
+
+	def __call__(self, execute, sql, params, many, context):
+		start = time.perf_counter()
+		try:
+			return execute(sql, params, many, context)
+		finally:
+			self.queries.append({
+				'alias': self.alias,
+				'sql': sql,
+				'ms': round((time.perf_counter() - start) * 1000, 3),
+				'many': many,
+				'call_site': _call_site(),
+			})
+
+
+class ProfilerUnavailable(Exception):
+	"""cProfile could not be enabled (another profiler is active in this process)."""
+
+
+class ProfileSession:
+	"""Context manager wrapping one request in cProfile + SQL capture."""
+
+	def __init__(self):
+		self.profiler = cProfile.Profile()
+		self.recorders = [_QueryRecorder(alias) for alias in connections]
+		self._stack = ExitStack()
+		self.started = None
+		self.elapsed_ms = None
+
+	def __enter__(self):
+		for recorder in self.recorders:
+			self._stack.enter_context(connections[recorder.alias].execute_wrapper(recorder))
+		self.started = time.perf_counter()
+		try:
+			self.profiler.enable()
+		except ValueError as exc:
+			# Python 3.12+ allows one active profiler per interpreter
+			self._stack.close()
+			raise ProfilerUnavailable(str(exc)) from exc
+		return self
+
+	def __exit__(self, *exc):
+		self.profiler.disable()
+		self.elapsed_ms = round((time.perf_counter() - self.started) * 1000, 3)
+		self._stack.close()
+		return False
+
+	@property
+	def queries(self):
+		return [q for r in self.recorders for q in r.queries]
+
+	def save(self, request, response, trigger):
+		"""Write ``.prof`` + ``.json`` and return the report name."""
+		now = datetime.now(dt_timezone.utc)
+		name = f'{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}'
+		directory = profile_dir()
+		self.profiler.dump_stats(str(directory / f'{name}.prof'))
+		stream = io.StringIO()
+		stats = pstats.Stats(self.profiler, stream=stream)
+		stats.strip_dirs().sort_stats('cumulative').print_stats(settings.PROFILE_TOP_FUNCTIONS)
+		queries = self.queries
+		user = getattr(request, 'user', None)
+		summary = {
+			'name': name,
+			'created_at': now.isoformat(),
+			'method': request.method,
+			'path': request.get_full_path(),
+			'status': getattr(response, 'status_code', None),
+			'user': user.get_username() if user is not None and user.is_authenticated else None,
+			'trigger': trigger,
+			'elapsed_ms': self.elapsed_ms,
+			'sql_count': len(queries),
+			'sql_ms': round(sum(q['ms'] for q in queries), 3),
+			'queries': queries,
+			'stats': stream.getvalue(),
+		}
+		with open(directory / f'{name}.json', 'w', encoding='utf-8') as fh:
+			json.dump(summary, fh)
+		_prune(directory)
+		return name
+
+
+def _prune(directory):
+	reports = sorted(directory.glob('*.json'))
+	for stale in reports[:max(0, len(reports) - settings.PROFILE_MAX_REPORTS)]:
+		stale.unlink(missing_ok=True)
+		stale.with_suffix('.prof').unlink(missing_ok=True)
+
+
+def list_reports():
+	"""Report summaries (without per-query detail), newest first."""
+	reports = []
+	for path in sorted(profile_dir().glob('*.json'), reverse=True):
+		try:
+			with open(path, encoding='utf-8') as fh:
+				data = json.load(fh)
+		except (OSError, ValueError):
+			continue
+		data.pop('queries', None)
+		data.pop('stats', None)
+		reports.append(data)
+	return reports
+
+
+def report_path(name, suffix):
+	"""Path of a stored report file, or None for unknown/malformed names."""
+	if not _REPORT_NAME.match(name or ''):
+		return None
+	path = profile_dir() / f'{name}{suffix}'
+	return path if path.exists() else None
+
+
+def load_report(name):
+	path = report_path(name, '.json')
+	if path is None:
+		return None
+	with open(path, encoding='utf-8') as fh:
+		return json.load(fh)
@@ -0,0 +1,150 @@
+"""Incremental daily sentiment rollups.
+
+Approved reviews are folded into ``AppSentimentDaily`` exactly once: the
+``Review.rolled_up`` flag is flipped in the same transaction that applies the
+deltas, so approving, importing and backfilling can all share this code path
+and re-running any of them never double counts.
+"""
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AppSentimentDaily, Review
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def normalize_sentiment(value):
+	value = (value or '').strip().lower()
+	return value or 'unknown'
+
+
+def _bucket_key(review):
+	created = review.created_at or timezone.now()
+	return (review.app_id, timezone.localdate(created), normalize_sentiment(review.sentiment))
+
+
+def _apply_deltas(deltas):
+	for (app_id, day, sentiment), d in deltas.items():
+		row, created = AppSentimentDaily.objects.get_or_create(
+			app_id=app_id, day=day, sentiment=sentiment, defaults=d,
+		)
+		if not created:
+			AppSentimentDaily.objects.filter(pk=row.pk).update(
+				review_count=F('review_count') + d['review_count'],
+				polarity_sum=F('polarity_sum') + d['polarity_sum'],
+				polarity_n=F('polarity_n') + d['polarity_n'],
+				subjectivity_sum=F('subjectivity_sum') + d['subjectivity_sum'],
+				subjectivity_n=F('subjectivity_n') + d['subjectivity_n'],
+			)
+
+
+def _collect(reviews):
+	deltas = defaultdict(lambda: {
+		'review_count': 0, 'polarity_sum': 0.0, 'polarity_n': 0,
+		'subjectivity_sum': 0.0, 'subjectivity_n': 0,
+	})
+	for r in reviews:
+		d = deltas[_bucket_key(r)]
+		d['review_count'] += 1
+		if r.sentiment_polarity is not None:
+			d['polarity_sum'] += r.sentiment_polarity
+			d['polarity_n'] += 1
+		if r.sentiment_subjectivity is not None:
+			d['subjectivity_sum'] += r.sentiment_subjectivity
+			d['subjectivity_n'] += 1
+	return deltas
+
+
+def record_review(review):
+	"""Fold a single approved review into the rollups (no-op if already applied)."""
+	if not review.approved:
+		return False
+	with transaction.atomic():
+		claimed = Review.objects.filter(pk=review.pk, approved=True, rolled_up=False).update(rolled_up=True)
+		if not claimed:
+			return False
+		_apply_deltas(_collect([review]))
+	review.rolled_up = True
+	return True
+
+
+def retract_reviews(reviews):
+	"""Subtract already rolled-up reviews (e.g. before deleting them)."""
+	applied = [r for r in reviews if r.rolled_up]
+	if not applied:
+		return 0
+	with transaction.atomic():
+		for (app_id, day, sentiment), d in _collect(applied).items():
+			AppSentimentDaily.objects.filter(app_id=app_id, day=day, sentiment=sentiment).update(
+				review_count=F('review_count') - d['review_count'],
+				polarity_sum=F('polarity_sum') - d['polarity_sum'],
+				polarity_n=F('polarity_n') - d['polarity_n'],
+				subjectivity_sum=F('subjectivity_sum') - d['subjectivity_sum'],
+				subjectivity_n=F('subjectivity_n') - d['subjectivity_n'],
+			)
+		Review.objects.filter(id__in=[r.id for r in applied]).update(rolled_up=False)
+	return len(applied)
+
+
+def rollup_pending(batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+	"""Roll up approved reviews not yet applied, in id-ordered batches.
+
+	Each batch commits on its own, so an interrupted run resumes where it
+	stopped. Overlapping runs never apply a review twice: on Postgres each
+	run locks its batch with ``SKIP LOCKED``; elsewhere every row is claimed
+	with the same compare-and-set ``record_review`` uses. Returns the number
+	of reviews processed.
+	"""
+	processed = 0
+	batches = 0
+	fields = ('id', 'app_id', 'created_at', 'sentiment', 'sentiment_polarity', 'sentiment_subjectivity', 'approved')
+	skip_locked = connection.features.has_select_for_update_skip_locked
+	while max_batches is None or batches < max_batches:
+		with transaction.atomic():
+			pending = Review.objects.filter(approved=True, rolled_up=False).order_by('id').only(*fields)
+			if skip_locked:
+				pending = pending.select_for_update(skip_locked=True)
+			batch = list(pending[:batch_size])
+			if not batch:
+				break
+			if skip_locked:
+				Review.objects.filter(id__in=[r.id for r in batch], rolled_up=False).update(rolled_up=True)
+				won = batch
+			else:
+				# No row locks: keep only the rows this run flips itself
+				won = [
+					r for r in batch
+					if Review.objects.filter(pk=r.pk, rolled_up=False).update(rolled_up=True)
+				]
+			_apply_deltas(_collect(won))
+		processed += len(won)
+		batches += 1
+	return processed
+
+
+def reset_rollups():
+	"""Drop all rollup rows and mark every review as pending again."""
+	with transaction.atomic():
+		AppSentimentDaily.objects.all().delete()
+		Review.objects.filter(rolled_up=True).update(rolled_up=False)
+
+
+def sentiment_series(app_id, start=None, end=None):
+	"""Return the rollup series for ``app_id`` grouped by sentiment."""
+	rows = AppSentimentDaily.objects.filter(app_id=app_id)
+	if start:
+		rows = rows.filter(day__gte=start)
+	if end:
+		rows = rows.filter(day__lte=end)
+	series = defaultdict(list)
+	for row in rows.order_by('day', 'sentiment'):
+		series[row.sentiment].append({
+			'date': row.day.isoformat(),
+			'count': row.review_count,
+			'mean_polarity': row.mean_polarity,
+			'mean_subjectivity': row.mean_subjectivity,
+		})
+	return dict(series)
@@ -0,0 +1,187 @@
+"""Immutable TF-IDF search index with background, single-flight rebuilds.
+
+Requests read whatever ``SearchIndex`` is currently published. When the
+catalog version moves on, one background thread builds a complete new index
+and publishes it with a single reference assignment (atomic under the GIL);
+until then queries keep using the previous index. Only the very first build
+in a process runs inline, since there is nothing older to serve.
+
+Requests routed to a replica observe the replica's catalog version, so a
+rebuild reads from the same database alias the request did, and an index
+that is *newer* than what a lagging replica reports still counts as fresh.
+Versions read from the primary are authoritative and compared exactly.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from . import db_routers
+from .catalog import Catalog
+from .http_cache import catalog_validators, catalog_version, request_catalog_version
+from .semantic import SemanticIndex
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1  # bump if logic changes
+MIN_SIMILARITY = 0.1
+
+
+def is_stale(index_version, observed, alias=None):
+	"""True if ``observed`` (read from ``alias``) means the index must be rebuilt.
+
+	Versions are ``(app_count, newest metadata_updated_at)``. From the primary
+	(``alias`` None) any difference is stale; a lower timestamp there can be
+	a deleted app. From a replica only a newer version is, since a lower one
+	is indistinguishable from replication lag.
+	"""
+	if alias is None:
+		return index_version != observed
+	index_count, index_ts = index_version
+	count, ts = observed
+	if index_ts != ts:
+		return ts is not None and (index_ts is None or ts > index_ts)
+	return index_count != count
+
+
+class SearchIndex:
+	"""Read-only snapshot: catalog rows aligned with the TF-IDF matrix rows."""
+
+	__slots__ = ('catalog_version', 'catalog', 'vectorizer', 'matrix', 'semantic')
+
+	def __init__(self, catalog_version, catalog, vectorizer=None, matrix=None, semantic=None):
+		self.catalog_version = catalog_version
+		self.catalog = catalog
+		self.vectorizer = vectorizer
+		self.matrix = matrix
+		self.semantic = semantic
+
+	@classmethod
+	def build(cls):
+		version = catalog_version()
+		catalog = Catalog.from_db()
+		if not len(catalog):
+			return cls(version, catalog)
+		vectorizer = TfidfVectorizer()
+		matrix = vectorizer.fit_transform(catalog.names())
+		semantic = SemanticIndex.build(catalog) if settings.SEMANTIC_SEARCH_ENABLED else None
+		return cls(version, catalog, vectorizer, matrix, semantic)
+
+	def search(self, query, limit=10):
+		"""Top ``limit`` catalog entries above ``MIN_SIMILARITY``, best first."""
+		if self.vectorizer is None:
+			return []
+		query_vec = self.vectorizer.transform([query])
+		similarities = cosine_similarity(query_vec, self.matrix).flatten()
+		indices = similarities.argsort()[-limit:][::-1]
+		return self.catalog.entries(i for i in indices if similarities[i] > MIN_SIMILARITY)
+
+	def semantic_search(self, query, limit=10):
+		"""LSA/ANN results, or None when semantic mode is unavailable."""
+		if self.semantic is None:
+			return None
+		return self.catalog.entries(self.semantic.search(query, limit=limit))
+
+
+class SearchIndexHolder:
+	def __init__(self):
+		self._current = None
+		self._lock = threading.Lock()
+		self._building = False
+
+	def get(self, version):
+		"""Return the published index, scheduling a rebuild if it is stale.
+
+		``version`` is what the calling request observed on its current read
+		alias; any rebuild reads from that same alias.
+		"""
+		alias = _read_alias()
+		index = self._current
+		if index is None:
+			return self._build_cold(alias)
+		if is_stale(index.catalog_version, version, alias):
+			self.refresh(alias)
+			if not settings.SEARCH_INDEX_ASYNC:
+				# Rebuilt inline: serve the new index, not the one we started with
+				return self._current
+		return index
+
+	def refresh(self, alias=None):
+		"""Start a background rebuild from ``alias`` unless one is already running."""
+		with self._lock:
+			if self._building:
+				return False
+			self._building = True
+		if not settings.SEARCH_INDEX_ASYNC:
+			self._rebuild(alias)
+			return True
+		threading.Thread(target=self._rebuild, args=(alias,), name='search-index-rebuild', daemon=True).start()
+		return True
+
+	def _build_cold(self, alias):
+		# Concurrent first requests wait for a single build and share it
+		with self._lock:
+			if self._current is None:
+				self._current = _build_from(alias)
+			return self._current
+
+	def _rebuild(self, alias):
+		try:
+			self._current = _build_from(alias)
+		except Exception:  # noqa: BLE001 - keep serving the previous index
+			logger.exception('Search index rebuild failed')
+		finally:
+			with self._lock:
+				self._building = False
+			if settings.SEARCH_INDEX_ASYNC:
+				# The worker thread opened its own DB connections
+				connections.close_all()
+
+
+def _read_alias():
+	state = db_routers.current_state()
+	return state.alias if state is not None else None
+
+
+def _build_from(alias):
+	"""``SearchIndex.build()`` with reads routed to ``alias`` (None = default)."""
+	token = db_routers.activate(db_routers.RoutingState(alias))
+	try:
+		return SearchIndex.build()
+	finally:
+		db_routers.deactivate(token)
+
+
+_holder = SearchIndexHolder()
+
+
+def get_index(version):
+	return _holder.get(version)
+
+
+def request_index(request):
+	"""``get_index`` memoized on the request, so validators and view share one index."""
+	index = getattr(request, '_search_index', None)
+	if index is None:
+		index = request._search_index = get_index(request_catalog_version(request))
+	return index
+
+
+def _index_validators(request):
+	index = request_index(request)
+	if is_stale(index.catalog_version, request_catalog_version(request), _read_alias()):
+		# Answers from a stale index must not be cached, or later revalidated
+		# as current once the rebuild lands
+		return None, None
+	return catalog_validators(index.catalog_version)
+
+
+def index_etag(request, *args, **kwargs):
+	return _index_validators(request)[0]
+
+
+def index_last_modified(request, *args, **kwargs):
+	return _index_validators(request)[1]
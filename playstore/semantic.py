@@ -0,0 +1,187 @@
+"""LSA semantic search with an IVF approximate-nearest-neighbour index.
+
+Each app becomes one document (name, category, genres and a capped sample of
+approved review text). TF-IDF is reduced with TruncatedSVD to dense,
+L2-normalized float32 vectors, so cosine similarity is a dot product.
+
+``IVFIndex`` is a plain-NumPy inverted-file index: spherical k-means splits
+the vectors into ``nlist`` clusters, vectors are stored contiguously per
+cluster, and a query only scores the ``nprobe`` clusters whose centroids are
+closest. ``nprobe`` trades recall for latency; see the ``benchmark_semantic``
+management command.
+"""
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .models import App, Review
+
+MAX_REVIEW_CHARS = 2000  # per app, keeps documents (and build time) bounded
+MIN_SCORE = 0.3
+_ASSIGN_CHUNK = 65536
+
+
+def _normalize(matrix):
+	norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+	norms[norms == 0] = 1.0
+	return (matrix / norms).astype(np.float32, copy=False)
+
+
+def _assign(vectors, centroids):
+	"""Nearest (max inner product) centroid for every vector, chunked to bound memory."""
+	labels = np.empty(len(vectors), dtype=np.int32)
+	for start in range(0, len(vectors), _ASSIGN_CHUNK):
+		block = vectors[start:start + _ASSIGN_CHUNK]
+		labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+	return labels
+
+
+def spherical_kmeans(vectors, nlist, iterations=10, sample_size=None, seed=0):
+	"""Cluster unit vectors by cosine similarity; returns unit-norm centroids."""
+	rng = np.random.default_rng(seed)
+	sample_size = sample_size or max(nlist * 64, 10000)
+	sample = vectors
+	if len(vectors) > sample_size:
+		sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+	centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+	for _ in range(iterations):
+		labels = _assign(sample, centroids)
+		sums = np.zeros_like(centroids)
+		np.add.at(sums, labels, sample)
+		counts = np.bincount(labels, minlength=nlist)
+		empty = counts == 0
+		if empty.any():
+			# Re-seed empty clusters with random sample points
+			sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+		centroids = _normalize(sums)
+	return centroids
+
+
+class IVFIndex:
+	"""Inverted-file ANN index over unit float32 vectors (inner product)."""
+
+	__slots__ = ('vectors', 'row_ids', 'centroids', 'offsets')
+
+	def __init__(self, vectors, row_ids, centroids, offsets):
+		self.vectors = vectors
+		self.row_ids = row_ids
+		self.centroids = centroids
+		self.offsets = offsets
+
+	@classmethod
+	def build(cls, vectors, nlist=None, iterations=10, seed=0):
+		vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+		n = len(vectors)
+		nlist = max(1, min(nlist or int(np.sqrt(n)), n))
+		centroids = spherical_kmeans(vectors, nlist, iterations=iterations, seed=seed)
+		labels = _assign(vectors, centroids)
+		order = np.argsort(labels, kind='stable')
+		offsets = np.zeros(nlist + 1, dtype=np.int64)
+		np.cumsum(np.bincount(labels, minlength=nlist), out=offsets[1:])
+		return cls(vectors[order], order.astype(np.int64), centroids, offsets)
+
+	def __len__(self):
+		return len(self.vectors)
+
+	@property
+	def nlist(self):
+		return len(self.centroids)
+
+	@property
+	def nbytes(self):
+		return self.vectors.nbytes + self.row_ids.nbytes + self.centroids.nbytes + self.offsets.nbytes
+
+	def search(self, query, k=10, nprobe=8):
+		"""Approximate top-``k`` as ``(row_ids, scores)``, best first."""
+		nprobe = min(nprobe, self.nlist)
+		centroid_scores = self.centroids @ query
+		probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+		ids, scores = [], []
+		for c in probes:
+			start, end = self.offsets[c], self.offsets[c + 1]
+			if start == end:
+				continue
+			ids.append(np.arange(start, end))
+			scores.append(self.vectors[start:end] @ query)
+		if not ids:
+			return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+		ids = np.concatenate(ids)
+		scores = np.concatenate(scores)
+		return self._top(ids, scores, k)
+
+	def exact(self, query, k=10):
+		"""Brute-force top-``k`` (ground truth for recall measurements)."""
+		scores = self.vectors @ query
+		return self._top(np.arange(len(scores)), scores, k)
+
+	def _top(self, positions, scores, k):
+		k = min(k, len(scores))
+		best = np.argpartition(-scores, k - 1)[:k]
+		best = best[np.argsort(-scores[best])]
+		return self.row_ids[positions[best]], scores[best]
+
+
+def app_documents(catalog):
+	"""One text document per catalog row: name, category, genres and review text."""
+	extra = dict(App.objects.values_list('id', 'genres').iterator(chunk_size=5000))
+	reviews = defaultdict(list)
+	used = defaultdict(int)
+	approved = Review.objects.filter(approved=True).order_by().values_list('app_id', 'text')
+	for app_id, text in approved.iterator(chunk_size=5000):
+		if used[app_id] >= MAX_REVIEW_CHARS or not text:
+			continue
+		snippet = text[:MAX_REVIEW_CHARS - used[app_id]]
+		reviews[app_id].append(snippet)
+		used[app_id] += len(snippet)
+	docs = []
+	for row in range(len(catalog)):
+		entry = catalog.entry(row)
+		genres = (extra.get(entry.id) or '').replace(';', ' ')
+		category = (entry.category or '').replace('_', ' ').lower()
+		docs.append(' '.join([entry.name, entry.name, category, genres, *reviews.get(entry.id, ())]))
+	return docs
+
+
+class SemanticIndex:
+	"""Vectorizer + SVD projection + IVF index, aligned with catalog rows."""
+
+	__slots__ = ('vectorizer', 'svd', 'ivf')
+
+	def __init__(self, vectorizer, svd, ivf):
+		self.vectorizer = vectorizer
+		self.svd = svd
+		self.ivf = ivf
+
+	@classmethod
+	def build(cls, catalog):
+		"""Return a SemanticIndex for ``catalog``, or None if it is too small."""
+		if len(catalog) < 3:
+			return None
+		docs = app_documents(catalog)
+		vectorizer = TfidfVectorizer(
+			stop_words='english', sublinear_tf=True,
+			min_df=2 if len(docs) >= 1000 else 1,
+			max_features=settings.SEMANTIC_MAX_FEATURES,
+		)
+		tfidf = vectorizer.fit_transform(docs)
+		components = min(settings.SEMANTIC_DIMENSIONS, tfidf.shape[1] - 1, len(docs) - 1)
+		if components < 2:
+			return None
+		svd = TruncatedSVD(n_components=components, random_state=0)
+		vectors = _normalize(svd.fit_transform(tfidf))
+		return cls(vectorizer, svd, IVFIndex.build(vectors))
+
+	def embed(self, text):
+		vec = self.svd.transform(self.vectorizer.transform([text]))
+		return _normalize(vec)[0]
+
+	def search(self, query, limit=10, nprobe=None):
+		"""Catalog rows most similar to ``query`` (best first), above ``MIN_SCORE``."""
+		vec = self.embed(query)
+		if not vec.any():
+			return []
+		rows, scores = self.ivf.search(vec, k=limit, nprobe=nprobe or settings.SEMANTIC_NPROBE)
+		return [int(r) for r, s in zip(rows, scores) if s >= MIN_SCORE]
@@ -5,9 +5,16 @@ urlpatterns = [
     path('', views.search, name='search'),
     path('autocomplete/', views.autocomplete, name='autocomplete'),
     path('app/<int:app_id>/', views.app_detail, name='app_detail'),
+    path('app/<int:app_id>/sentiment_series/', views.app_sentiment_series, name='app_sentiment_series'),
     path('app/<int:app_id>/add_review/', views.add_review, name='add_review'),
+    path('api/reviews/batch/', views.ingest_reviews, name='ingest_reviews'),
     path('supervisor/reviews/', views.supervisor_reviews, name='supervisor_reviews'),
     path('supervisor/review/<int:review_id>/approve/', views.approve_review, name='approve_review'),
+    path('supervisor/reviews/release/', views.release_reviews, name='release_reviews'),
+    path('supervisor/duplicates/discard/', views.discard_duplicates, name='discard_duplicates'),
+    path('staff/profiles/', views.request_profiles, name='request_profiles'),
+    path('staff/analytics/', views.analytics_dashboard, name='analytics_dashboard'),
+    path('staff/profiles/<str:name>/', views.request_profile_detail, name='request_profile_detail'),
     path('accounts/register/', views.register, name='register'),
     path('accounts/profile/', views.profile, name='profile'),
 ]
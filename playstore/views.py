@@ -1,15 +1,22 @@
 
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, JsonResponse
 from django.contrib.auth.decorators import login_required
-from .models import App, Review, ReviewApproval, UserProfile
+from django.contrib.admin.views.decorators import staff_member_required
+from .models import App, Review, UserProfile
 from django.contrib.auth.models import User
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib import messages
 from django.contrib.auth import login as auth_login
+from django.utils.dateparse import parse_date
+from django.conf import settings
+from django.db.models import Count, Q
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from . import analytics, dedup, ingest, moderation, profiling, rollups, search_index
+from .db_routers import replica_reads
+from .http_cache import app_etag, app_last_modified, conditional_view
 
 
 # Custom registration form with email
@@ -48,58 +55,38 @@ def profile(request):
 	profile = UserProfile.objects.get(user=request.user)
 	return render(request, 'registration/profile.html', {'profile': profile})
 
-_SEARCH_CACHE = {
-	'version': 0,  # bump if logic changes
-	'app_count': 0,
-	'vectorizer': None,
-	'matrix': None,
-	'app_ids': [],
-}
-
-def _build_search_cache():  # pragma: no cover - simple helper
-	apps = list(App.objects.all().only('id', 'name'))
-	names = [a.name for a in apps]
-	if not names:
-		_SEARCH_CACHE.update({'app_count': 0, 'vectorizer': None, 'matrix': None, 'app_ids': []})
-		return
-	vectorizer = TfidfVectorizer()
-	matrix = vectorizer.fit_transform(names)
-	_SEARCH_CACHE.update({
-		'app_count': len(apps),
-		'vectorizer': vectorizer,
-		'matrix': matrix,
-		'app_ids': [a.id for a in apps],
-	})
-
+@replica_reads
 def search(request):
 	query = request.GET.get('q', '').strip()
+	mode = 'semantic' if request.GET.get('mode') == 'semantic' and settings.SEMANTIC_SEARCH_ENABLED else 'lexical'
 	results = []
 	if query:
-		# Refresh cache if app count changed (cheap heuristic)
-		current_count = App.objects.count()
-		if _SEARCH_CACHE['vectorizer'] is None or _SEARCH_CACHE['app_count'] != current_count:
-			_build_search_cache()
-		vec = _SEARCH_CACHE['vectorizer']
-		mat = _SEARCH_CACHE['matrix']
-		if vec is not None and mat is not None:
-			query_vec = vec.transform([query])
-			similarities = cosine_similarity(query_vec, mat).flatten()
-			# Get top 10 with similarity threshold
-			indices = similarities.argsort()[-10:][::-1]
-			app_id_list = []
-			for i in indices:
-				if similarities[i] > 0.1:
-					app_id_list.append(_SEARCH_CACHE['app_ids'][int(i)])
-			results = list(App.objects.filter(id__in=app_id_list)) if app_id_list else []
-	return render(request, 'search.html', {'results': results, 'query': query})
+		# Stale indexes are rebuilt in the background; this request uses the current one
+		index = search_index.request_index(request)
+		if mode == 'semantic':
+			results = index.semantic_search(query, limit=10)
+		if results is None or mode == 'lexical':
+			results = index.search(query, limit=10)
+	return render(request, 'search.html', {
+		'results': results,
+		'query': query,
+		'mode': mode,
+		'semantic_enabled': settings.SEMANTIC_SEARCH_ENABLED,
+	})
 
+@replica_reads
+@conditional_view(search_index.index_etag, search_index.index_last_modified, public=True, max_age=settings.AUTOCOMPLETE_CACHE_SECONDS)
 def autocomplete(request):
 	term = request.GET.get('term', '').strip()
 	if len(term) < 3:
 		return JsonResponse([], safe=False)
-	suggestions = list(App.objects.filter(name__icontains=term).values_list('name', flat=True)[:10])
+	# Same index the ETag was computed from
+	catalog = search_index.request_index(request).catalog
+	suggestions = [catalog.name(row) for row in catalog.search_substring(term, limit=10)]
 	return JsonResponse(suggestions, safe=False)
 
+@replica_reads
+@conditional_view(app_etag, app_last_modified, public=True, max_age=0, must_revalidate=True)
 def app_detail(request, app_id):
 	app = get_object_or_404(App, id=app_id)
 	reviews = app.reviews.filter(approved=True)
@@ -116,12 +103,58 @@ def app_detail(request, app_id):
 		'sentiment_counts': sentiment_counts,
 	})
 
+@replica_reads
+def app_sentiment_series(request, app_id):
+	"""JSON sentiment time series for charts, served from daily rollups."""
+	app = get_object_or_404(App.objects.only('id'), id=app_id)
+	bounds = {}
+	for key in ('start', 'end'):
+		raw = request.GET.get(key, '').strip()
+		if raw:
+			try:
+				bounds[key] = parse_date(raw)
+			except ValueError:
+				bounds[key] = None
+			if bounds[key] is None:
+				return JsonResponse({'error': f'Invalid {key} date; expected YYYY-MM-DD.'}, status=400)
+	series = rollups.sentiment_series(app.id, start=bounds.get('start'), end=bounds.get('end'))
+	return JsonResponse({'app_id': app.id, 'series': series})
+
+@csrf_exempt
+@require_POST
+def ingest_reviews(request):
+	"""Bulk review ingestion for partners (JSON list or NDJSON, Bearer API key).
+
+	Every accepted review is queued for moderation; the response reports a
+	status per input item, in input order.
+	"""
+	key = ingest.authenticate(request)
+	if key is None:
+		return JsonResponse({'error': 'Missing or invalid API key.'}, status=401)
+	limit = settings.INGEST_MAX_BYTES
+	try:
+		declared = int(request.META.get('CONTENT_LENGTH') or 0)
+	except ValueError:
+		declared = 0
+	# Read the stream directly: request.body is capped by DATA_UPLOAD_MAX_MEMORY_SIZE
+	body = request.read(limit + 1)
+	if declared > limit or len(body) > limit:
+		return JsonResponse({'error': f'Body larger than {limit} bytes.'}, status=413)
+	try:
+		items = ingest.parse_items(body, request.content_type or '')
+	except ingest.IngestError as exc:
+		return JsonResponse({'error': str(exc)}, status=exc.status)
+	results = ingest.ingest(items, key.user)
+	queued = sum(1 for r in results if r['status'] == 'queued')
+	return JsonResponse({'queued': queued, 'rejected': len(results) - queued, 'items': results})
+
 @login_required
 def add_review(request, app_id):
 	app = get_object_or_404(App, id=app_id)
 	if request.method == 'POST':
 		text = request.POST.get('text')
 		review = Review.objects.create(app=app, user=request.user, text=text, approved=False)
+		dedup.index_reviews([review])
 		from django.contrib import messages
 		messages.success(request, 'Your review has been submitted and is pending approval.')
 		return redirect('app_detail', app_id=app.id)
@@ -139,19 +172,103 @@ def supervisor_reviews(request):
 		'neutral': reviews.filter(sentiment__iexact='neutral').count(),
 		'total': reviews.count(),
 	}
+	# Each supervisor works only on their own leased batch
+	moderation.claim_batch(request.user)
+	claimed = moderation.active_claims(request.user)
+	# Near-duplicates are collapsed out of the main queue into their own list
+	queue = claimed.filter(duplicate_of__isnull=True).select_related('app', 'user').order_by('id').annotate(
+		duplicate_count=Count('near_duplicates', filter=Q(near_duplicates__approved=False)),
+	)
+	flagged = claimed.filter(duplicate_of__isnull=False).select_related('app', 'user', 'duplicate_of').order_by('id')
 	return render(request, 'supervisor_reviews.html', {
-		'reviews': reviews,
+		'reviews': queue,
+		'flagged_reviews': flagged,
 		'sentiment_counts': sentiment_counts,
+		'batch_count': claimed.count(),
+		'lease_minutes': settings.MODERATION_LEASE_SECONDS // 60,
 	})
 
+@login_required
+@require_POST
+def release_reviews(request):
+	"""Return the supervisor's unfinished batch to the shared pool."""
+	profile = UserProfile.objects.get(user=request.user)
+	if not profile.is_supervisor:
+		return redirect('search')
+	released = moderation.release_claims(request.user)
+	messages.info(request, f'Released {released} review(s) back to the queue.')
+	return redirect('search')
+
+@login_required
+@require_POST
+def discard_duplicates(request):
+	"""Delete flagged near-duplicates from the supervisor's batch (one, or all with no id)."""
+	profile = UserProfile.objects.get(user=request.user)
+	if not profile.is_supervisor:
+		return redirect('search')
+	flagged = moderation.active_claims(request.user).filter(duplicate_of__isnull=False)
+	review_id = request.POST.get('review_id', '').strip()
+	if review_id:
+		if not review_id.isdigit():
+			return redirect('supervisor_reviews')
+		flagged = flagged.filter(id=int(review_id))
+	deleted = dedup.discard_reviews(flagged)
+	messages.success(request, f'Discarded {deleted} near-duplicate review(s).')
+	return redirect('supervisor_reviews')
+
 @login_required
 def approve_review(request, review_id):
 	profile = UserProfile.objects.get(user=request.user)
 	if not profile.is_supervisor:
 		return redirect('search')
-	review = get_object_or_404(Review, id=review_id)
+	get_object_or_404(Review.objects.only('id'), id=review_id)
 	if request.method == 'POST':
-		review.approved = True
-		review.save()
-		ReviewApproval.objects.create(review=review, supervisor=request.user, approved=True)
+		outcome = moderation.approve(review_id, request.user)
+		if outcome == moderation.ALREADY_APPROVED:
+			messages.info(request, 'That review was already approved.')
+		elif outcome == moderation.LEASED_ELSEWHERE:
+			messages.warning(request, 'Lease lost: that review is held by another supervisor.')
 	return redirect('supervisor_reviews')
+
+@staff_member_required
+def request_profiles(request):
+	return render(request, 'request_profiles.html', {
+		'reports': profiling.list_reports(),
+		'sample_rate': settings.PROFILE_SAMPLE_RATE,
+	})
+
+@staff_member_required
+def request_profile_detail(request, name):
+	report = profiling.load_report(name)
+	if report is None:
+		raise Http404('Unknown profile report')
+	if request.GET.get('download') == 'prof':
+		path = profiling.report_path(name, '.prof')
+		if path is None:
+			raise Http404('Raw profile missing')
+		return FileResponse(open(path, 'rb'), as_attachment=True, filename=f'{name}.prof')
+	queries = sorted(report['queries'], key=lambda q: q['ms'], reverse=True)
+	return render(request, 'request_profile_detail.html', {'report': report, 'queries': queries})
+
+@staff_member_required
+def analytics_dashboard(request):
+	"""Catalog/review aggregations from the latest columnar snapshot (no DB queries)."""
+	snapshot = analytics.load_snapshot()
+	if snapshot is None:
+		if request.GET.get('format') == 'json':
+			return JsonResponse({'error': 'No analytics snapshot; run manage.py export_snapshot.'}, status=503)
+		return render(request, 'analytics_dashboard.html', {'snapshot': None}, status=503)
+	category = request.GET.get('category', '').strip() or None
+	approved_only = request.GET.get('approved') == '1'
+	data = {
+		'snapshot': snapshot.manifest,
+		'category': category,
+		'approved_only': approved_only,
+		'categories': analytics.records(analytics.category_summary(snapshot, category)),
+		'genre_sentiment': analytics.records(analytics.genre_sentiment(snapshot, category, approved_only)),
+		'installs': analytics.records(analytics.installs_distribution(snapshot, category)),
+	}
+	if request.GET.get('format') == 'json':
+		return JsonResponse(data)
+	data['category_choices'] = snapshot.apps['category'].cat.categories.tolist()
+	return render(request, 'analytics_dashboard.html', data)
@@ -59,6 +59,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'playstore.middleware.RequestProfilerMiddleware',
+    'playstore.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -94,13 +96,32 @@ WSGI_APPLICATION = 'project_config.wsgi.application'
 #   DJANGO_DB_BACKEND = postgres | sqlite (default: postgres)
 #   DJANGO_DB_NAME, DJANGO_DB_USER, DJANGO_DB_PASSWORD, DJANGO_DB_HOST, DJANGO_DB_PORT
 #
+# Connection reuse / pooling:
+#   DJANGO_DB_CONN_MAX_AGE = seconds to keep a connection open between requests
+#                            (default 60; 0 = close after every request)
+#   DJANGO_DB_POOL = 1 -> use Django's native Postgres pool instead
+#                         (requires psycopg>=3 with the pool extra; forces CONN_MAX_AGE=0)
+#
+# Read replicas (see playstore/db_routers.py):
+#   DJANGO_DB_REPLICAS = comma-separated replicas, exposed as aliases replica1, replica2, ...
+#                        Postgres: host or host:port (same credentials as primary)
+#                        SQLite:   file path (relative to the repo root), e.g.
+#                                  db_replica1.sqlite3 for local testing
+#   DJANGO_DB_REPLICA_STICKY_SECONDS = how long a client reads from the primary after
+#                                      it wrote (read-your-writes; default 10)
+#
 DB_BACKEND = os.environ.get('DJANGO_DB_BACKEND', 'postgres').lower()
+DB_CONN_MAX_AGE = int(os.environ.get('DJANGO_DB_CONN_MAX_AGE', '60'))
+DB_POOL = os.environ.get('DJANGO_DB_POOL', '0') == '1'
+DB_REPLICAS = [r.strip() for r in os.environ.get('DJANGO_DB_REPLICAS', '').split(',') if r.strip()]
 
 if DB_BACKEND == 'sqlite':
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_MAX_AGE > 0,
         }
     }
 else:
@@ -113,8 +134,28 @@ else:
             'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', 'playstore_pass'),
             'HOST': os.environ.get('DJANGO_DB_HOST', 'localhost'),
             'PORT': os.environ.get('DJANGO_DB_PORT', '5432'),
+            'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': not DB_POOL and DB_CONN_MAX_AGE > 0,
         }
     }
+    if DB_POOL:
+        DATABASES['default']['OPTIONS'] = {'pool': True}
+
+for _i, _replica in enumerate(DB_REPLICAS, start=1):
+    _cfg = dict(DATABASES['default'])
+    if DB_BACKEND == 'sqlite':
+        _cfg['NAME'] = BASE_DIR / _replica
+    else:
+        _host, _, _port = _replica.partition(':')
+        _cfg['HOST'] = _host
+        _cfg['PORT'] = _port or DATABASES['default']['PORT']
+    # Tests run against the primary; replicas just mirror it.
+    _cfg['TEST'] = {'MIRROR': 'default'}
+    DATABASES[f'replica{_i}'] = _cfg
+
+DATABASE_REPLICAS = [f'replica{i}' for i in range(1, len(DB_REPLICAS) + 1)]
+DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get('DJANGO_DB_REPLICA_STICKY_SECONDS', '10'))
+DATABASE_ROUTERS = ['playstore.db_routers.PrimaryReplicaRouter']
 
 
 
@@ -160,6 +201,48 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# HTTP caching (see playstore/http_cache.py)
+# Bump HTTP_CACHE_VERSION on deploys that change page templates so clients
+# holding old ETags re-download instead of receiving 304s.
+HTTP_CACHE_VERSION = os.environ.get('HTTP_CACHE_VERSION', '1')
+AUTOCOMPLETE_CACHE_SECONDS = int(os.environ.get('AUTOCOMPLETE_CACHE_SECONDS', '300'))
+
+# Search index (see playstore/search_index.py): rebuild stale indexes in a
+# background thread while requests keep serving the previous one. Set to 0
+# to rebuild inline (e.g. in one-off scripts).
+SEARCH_INDEX_ASYNC = os.environ.get('SEARCH_INDEX_ASYNC', '1') == '1'
+
+# Optional LSA semantic search mode (see playstore/semantic.py), built with
+# the search index. SEMANTIC_NPROBE = IVF clusters scanned per query.
+SEMANTIC_SEARCH_ENABLED = os.environ.get('SEMANTIC_SEARCH_ENABLED', '0') == '1'
+SEMANTIC_DIMENSIONS = int(os.environ.get('SEMANTIC_DIMENSIONS', '128'))
+SEMANTIC_MAX_FEATURES = int(os.environ.get('SEMANTIC_MAX_FEATURES', '200000'))
+SEMANTIC_NPROBE = int(os.environ.get('SEMANTIC_NPROBE', '16'))
+
+# Partner batch ingestion (POST /api/reviews/batch/, see playstore/ingest.py)
+INGEST_MAX_BATCH = int(os.environ.get('INGEST_MAX_BATCH', '5000'))
+INGEST_MAX_BYTES = int(os.environ.get('INGEST_MAX_BYTES', str(20 * 1024 * 1024)))
+INGEST_INSERT_BATCH = int(os.environ.get('INGEST_INSERT_BATCH', '1000'))
+
+# Moderation queue (see playstore/moderation.py): each supervisor leases
+# MODERATION_BATCH_SIZE pending reviews for MODERATION_LEASE_SECONDS.
+MODERATION_BATCH_SIZE = int(os.environ.get('MODERATION_BATCH_SIZE', '20'))
+MODERATION_LEASE_SECONDS = int(os.environ.get('MODERATION_LEASE_SECONDS', '600'))
+
+# On-demand request profiling (see playstore/profiling.py). Staff send
+# `X-Profile: 1` or `?_profile=1`; PROFILE_SAMPLE_RATE (0.0-1.0) samples any
+# request. Reports are browsable at /staff/profiles/.
+PROFILE_ENABLED = os.environ.get('PROFILE_ENABLED', '1') == '1'
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR = Path(os.environ.get('PROFILE_DIR', BASE_DIR / 'profiles'))
+PROFILE_MAX_REPORTS = int(os.environ.get('PROFILE_MAX_REPORTS', '200'))
+PROFILE_TOP_FUNCTIONS = int(os.environ.get('PROFILE_TOP_FUNCTIONS', '60'))
+
+# Analytics snapshots (see playstore/analytics.py): `manage.py export_snapshot`
+# writes Parquet here; /staff/analytics/ reads only the latest snapshot.
+ANALYTICS_SNAPSHOT_DIR = Path(os.environ.get('ANALYTICS_SNAPSHOT_DIR', BASE_DIR / 'snapshots'))
+ANALYTICS_SNAPSHOT_KEEP = int(os.environ.get('ANALYTICS_SNAPSHOT_KEEP', '3'))
+
 # Basic logging configuration (console focused)
 LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
 LOGGING = {